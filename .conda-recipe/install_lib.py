@@ -0,0 +1,87 @@
+'''
+Install the `m5_lvgl` MicroPython library, as `.py` sources or, on request,
+precompiled to `.mpy` bytecode.
+
+With `M5_LVGL_MPY=1`, each module is compiled with `mpy-cross`, so the board
+does not compile the sources (with the transient heap use that implies) on
+every boot.  `.mpy` files only import on firmware with the same bytecode
+version as `mpy-cross`, so this is opt-in: use it for installs targeting
+known firmware.  Modules are still installed as `.py` sources if
+`mpy-cross` is not found or fails on a module.
+
+Environment variables:
+
+ - `M5_LVGL_MPY`: set to `1` to install `.mpy` bytecode.
+ - `MPY_CROSS`: `mpy-cross` executable (default: found on `PATH`).  Its
+   version must match the bytecode version of the target firmware.
+ - `MPY_CROSS_FLAGS`: extra `mpy-cross` arguments, e.g. `-march=xtensawin`.
+
+Usage::
+
+    python .conda-recipe/install_lib.py [install_dir]
+
+Without `install_dir`, installs to the Conda `micropython-lib` directory.
+'''
+import os
+import shutil
+import subprocess
+import sys
+
+
+MODULE_NAME = 'm5_lvgl'
+
+
+def find_mpy_cross():
+    if os.environ.get('M5_LVGL_MPY', '0') != '1':
+        return None
+    return os.environ.get('MPY_CROSS') or shutil.which('mpy-cross')
+
+
+def compile_mpy(mpy_cross, source, target, name):
+    command = ([mpy_cross] + os.environ.get('MPY_CROSS_FLAGS', '').split() +
+               ['-o', target, '-s', name, source])
+    try:
+        subprocess.check_call(command)
+    except (OSError, subprocess.CalledProcessError) as exception:
+        print('%s: mpy-cross failed (%s); installing source' % (name,
+                                                                exception))
+        if os.path.exists(target):
+            os.remove(target)
+        return False
+    return True
+
+
+def install(source_dir, install_dir):
+    mpy_cross = find_mpy_cross()
+    if mpy_cross is None:
+        print('mpy-cross not used; installing sources')
+    if os.path.exists(install_dir):
+        shutil.rmtree(install_dir)
+    os.makedirs(install_dir)
+    for name in sorted(os.listdir(source_dir)):
+        if not name.endswith('.py'):
+            continue
+        source = os.path.join(source_dir, name)
+        target = os.path.join(install_dir, name[:-3] + '.mpy')
+        # Only one of `.py` and `.mpy` may be installed: MicroPython imports
+        # a `.py` file in preference to the `.mpy` file next to it.
+        if not (mpy_cross and compile_mpy(mpy_cross, source, target,
+                                          MODULE_NAME + '/' + name)):
+            shutil.copy2(source, install_dir)
+
+
+def main(args):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    source_dir = os.path.join(root, 'micropython-src', MODULE_NAME)
+    if args:
+        install_dir = args[0]
+    else:
+        import platformio_helpers as pioh
+
+        install_dir = str(pioh.conda_bin_path().parent
+                          .joinpath('micropython-lib', MODULE_NAME))
+    install(source_dir, install_dir)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
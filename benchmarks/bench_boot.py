@@ -0,0 +1,64 @@
+'''
+Measure import time and heap use of each `m5_lvgl` entry point.
+
+Each entry point is imported from scratch (its `m5_lvgl` modules are removed
+from `sys.modules` first), and the time taken and the drop in
+`gc.mem_free()` are reported.  `driver` is `from m5_lvgl.driver import *`
+and `all` accesses every name in `m5_lvgl.__all__`.  Built-in and stub modules (e.g., `lvgl`,
+`machine`) stay loaded after the first import, so for on-device figures
+including them, soft reset and measure one entry point at a time::
+
+    micropython benchmarks/bench_boot.py ButtonsInputEncoder
+'''
+import benchutil
+
+import gc
+import sys
+
+import utime
+
+
+ENTRY_POINTS = ('ButtonsInputEncoder', 'FacesEncoderInputEncoder',
+                'EncoderInputDriver', 'M5ili9341', 'driver', 'all')
+
+
+def unload():
+    for name in list(sys.modules):
+        if name == 'm5_lvgl' or name.startswith('m5_lvgl.'):
+            del sys.modules[name]
+
+
+def measure(entry_point):
+    unload()
+    gc.collect()
+    free = gc.mem_free()
+    start = utime.ticks_us()
+    package = __import__('m5_lvgl')
+    if entry_point == 'driver':
+        # `from m5_lvgl import *` binds nothing on MicroPython.
+        exec('from m5_lvgl.driver import *', {})
+    elif entry_point == 'all':
+        for name in package.__all__:
+            getattr(package, name)
+    else:
+        getattr(package, entry_point)
+    elapsed = utime.ticks_diff(utime.ticks_us(), start)
+    gc.collect()
+    used = free - gc.mem_free()
+    modules = [name for name in sys.modules if name.startswith('m5_lvgl.')]
+    return elapsed, used, len(modules)
+
+
+def main(entry_points=ENTRY_POINTS):
+    for entry_point in entry_points:
+        try:
+            elapsed, used, modules = measure(entry_point)
+        except ImportError as exception:
+            print('%-26s skipped (%s)' % (entry_point, exception))
+            continue
+        print('%-26s %8dus %8d bytes %3d modules' % (entry_point, elapsed,
+                                                      used, modules))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:] or ENTRY_POINTS)
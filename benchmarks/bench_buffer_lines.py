@@ -0,0 +1,44 @@
+'''
+Sweep M5ili9341 draw buffer heights and record full-screen refresh rate for
+the reference scene.  Runs headless on an LVGL-enabled unix port, or on the
+device (e.g. with `ampy run`, after copying `benchutil.py` and `scene.py` to
+it) for real SPI timings.
+'''
+import benchutil
+
+import gc
+
+import lvgl as lv
+import utime
+
+from m5_lvgl import M5ili9341
+from scene import build_scene, refresh
+
+
+FRAMES = 20
+LINES = (10, 20, 40, 60, 80, 120)
+
+
+def main():
+    lv.init()
+    disp = M5ili9341(hybrid=False, buffer_lines='auto')
+    print('auto-tuned: %d lines' % disp.buffer_lines)
+    scr, label = build_scene()
+    for lines in LINES:
+        try:
+            disp.init_buffers(count=2, lines=lines)
+        except MemoryError:
+            print('%4d lines: allocation failed' % lines)
+            continue
+        gc.collect()
+        refresh(disp, scr)
+        start = utime.ticks_us()
+        for i in range(FRAMES):
+            refresh(disp, scr)
+        elapsed = utime.ticks_diff(utime.ticks_us(), start)
+        print('%4d lines: %6.1f fps (render %dus, transfer %dus per frame)' %
+              (lines, FRAMES * 1e6 / elapsed, disp.render_us,
+               disp.transfer_us))
+
+
+main()
@@ -0,0 +1,66 @@
+'''
+Drive synthetic, bouncing edge trains through the stand-in `machine.Pin` and
+check that `ButtonsInputEncoder` counts each click exactly once.
+'''
+import benchutil
+
+import sys
+
+import utime
+
+from m5_lvgl import ButtonsInputEncoder
+
+
+CLICKS = 10
+BOUNCES = 4
+
+
+def bounce(pin, level, count=BOUNCES):
+    # Contact bounce: the line toggles every millisecond before settling.
+    for i in range(count):
+        pin.drive(level)
+        utime.sleep_ms(1)
+        pin.drive(1 - level)
+        utime.sleep_ms(1)
+    pin.drive(level)
+
+
+def click(pin, hold_ms=50, gap_ms=50):
+    bounce(pin, 0)
+    utime.sleep_ms(hold_ms)
+    bounce(pin, 1)
+    utime.sleep_ms(gap_ms)
+
+
+def main():
+    encoder = ButtonsInputEncoder(debounce_ms=20)
+    failed = False
+
+    for i in range(CLICKS):
+        click(encoder._btn_right)
+    for i in range(CLICKS // 2):
+        click(encoder._btn_left)
+    diff = encoder.diff
+    print('rotate: diff=%d (expected %d), rejected left=%d right=%d' %
+          (diff, CLICKS - CLICKS // 2, encoder.rejected_left,
+           encoder.rejected_right))
+    failed |= diff != CLICKS - CLICKS // 2
+
+    presses = 0
+    for i in range(CLICKS):
+        bounce(encoder._btn_press, 0)
+        utime.sleep_ms(30)
+        presses += encoder.pressed
+        bounce(encoder._btn_press, 1)
+        utime.sleep_ms(30)
+        failed |= encoder.pressed
+    print('press: %d/%d presses seen, rejected=%d' %
+          (presses, CLICKS, encoder.rejected_press))
+    failed |= presses != CLICKS
+
+    if failed:
+        print('FAIL')
+        sys.exit(1)
+
+
+main()
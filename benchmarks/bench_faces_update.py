@@ -0,0 +1,51 @@
+'''
+Measure `FacesEncoderInputEncoder.update` throughput against a fake I2C bus
+and check that the update hot path does not allocate on the heap.
+'''
+import benchutil
+
+import gc
+import sys
+
+import machine
+import utime
+
+from m5_lvgl import FacesEncoderInputEncoder
+
+
+UPDATES = 10000
+
+
+class NoCollect:
+    def poll(self, active=False):
+        return False
+
+
+def main():
+    i2c = machine.I2C()
+    encoder = FacesEncoderInputEncoder(i2c, gc_scheduler=NoCollect())
+    # One step counter-clockwise per read (-1 as signed byte), not pressed.
+    i2c.set_response(encoder.addr, b'\xff\x01\x00')
+    encoder.update()
+
+    gc.collect()
+    gc.disable()
+    before = gc.mem_alloc()
+    start = utime.ticks_us()
+    for i in range(UPDATES):
+        encoder.update()
+    elapsed = utime.ticks_diff(utime.ticks_us(), start)
+    allocated = gc.mem_alloc() - before
+    gc.enable()
+
+    print('update: %d calls in %dus (%.2fus/call), %d bytes allocated' %
+          (UPDATES, elapsed, elapsed / UPDATES, allocated))
+    if encoder.diff != -(UPDATES + 1):
+        print('FAIL: decoded diff mismatch')
+        sys.exit(1)
+    if allocated != 0:
+        print('FAIL: update() allocated on the heap')
+        sys.exit(1)
+
+
+main()
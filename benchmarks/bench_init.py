@@ -0,0 +1,35 @@
+'''
+Measure M5ili9341 initialization time on the cold (reset and full
+initialization sequence) and warm-start paths.  Runs headless on an
+LVGL-enabled unix port, where the times are just the emulated panel delays
+(useful to check which commands each path sends), or on the device, where
+each path should be run in a fresh session, e.g.::
+
+    micropython benchmarks/bench_init.py cold
+    micropython benchmarks/bench_init.py warm
+'''
+import benchutil
+
+import sys
+
+import lvgl as lv
+import utime
+
+from m5_lvgl import M5ili9341
+
+
+def main(paths=('cold', 'warm')):
+    lv.init()
+    for path in paths:
+        start = utime.ticks_ms()
+        disp = M5ili9341(use_lvesp32=False, warm_start=(path == 'warm'))
+        total_ms = utime.ticks_diff(utime.ticks_ms(), start)
+        # Headless displays count the commands that crossed the bus.
+        commands = getattr(disp, 'commands', None)
+        print('%-5s init_time_ms=%4d constructor=%4dms%s' %
+              (path, disp.init_time_ms, total_ms,
+               '' if commands is None else ' commands=%d' % commands))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:] or ('cold', 'warm'))
@@ -0,0 +1,58 @@
+'''
+Compare import time and heap use of `m5_lvgl` (every module, loaded by
+accessing each public name) installed as `.py` sources, as `mpy-cross`
+bytecode, and frozen into the firmware.
+
+Run each variant in a fresh interpreter, from the repository root, with the
+MicroPython unix port::
+
+    micropython benchmarks/bench_mpy.py py
+
+    python .conda-recipe/install_lib.py build/mpy/m5_lvgl
+    micropython benchmarks/bench_mpy.py mpy build/mpy
+
+    # Unix port built with FROZEN_MANIFEST=micropython-src/manifest.py.
+    micropython benchmarks/bench_mpy.py frozen
+
+The garbage collector is disabled while importing, so ``allocated`` counts
+every byte allocated by the import, including compiler garbage; it is the
+peak heap use of the import.  ``retained`` is what is left after a
+collection.
+'''
+import benchutil
+
+import gc
+import sys
+
+import utime
+
+
+def main(variant='py', path=None):
+    # `benchutil` puts the sources first on the path.
+    sys.path.remove('micropython-src')
+    if variant == 'py':
+        sys.path.insert(0, 'micropython-src')
+    elif variant == 'mpy':
+        sys.path.insert(0, path or 'build/mpy')
+    gc.collect()
+    gc.disable()
+    before = gc.mem_alloc()
+    start = utime.ticks_us()
+    import m5_lvgl
+
+    # Load every module: `import m5_lvgl` only runs the lazy `__init__`, and
+    # on MicroPython `from m5_lvgl import *` loads nothing.
+    for name in m5_lvgl.__all__:
+        getattr(m5_lvgl, name)
+    elapsed = utime.ticks_diff(utime.ticks_us(), start)
+    allocated = gc.mem_alloc() - before
+    gc.enable()
+    gc.collect()
+    retained = gc.mem_alloc() - before
+    print('%-6s %8dus %8d bytes allocated %8d bytes retained  (%s)' %
+          (variant, elapsed, allocated, retained,
+           getattr(m5_lvgl, '__file__', '?')))
+
+
+if __name__ == '__main__':
+    main(*sys.argv[1:3])
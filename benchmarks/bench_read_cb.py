@@ -0,0 +1,56 @@
+'''
+Measure `EncoderInputDriver` read callback latency with the budgeted GC
+scheduler versus collecting garbage on every call (the previous behaviour).
+'''
+import benchutil
+
+import array
+import gc
+
+import lvgl as lv
+import utime
+
+from m5_lvgl import EncoderInputDriver, GCScheduler
+
+
+CALLS = 2000
+
+
+class AlwaysCollect:
+    def poll(self, active=False):
+        gc.collect()
+        return True
+
+
+class IdleEncoder:
+    diff = 0
+    pressed = False
+
+
+def run(gc_scheduler):
+    driver = EncoderInputDriver(IdleEncoder(), gc_scheduler=gc_scheduler)
+    read_cb = driver.drv.read_cb
+    data = lv.indev_data_t()
+    samples = array.array('I', bytearray(4 * CALLS))
+    for i in range(CALLS):
+        # Simulate application garbage produced between indev polls.
+        junk = [i] * 8
+        start = utime.ticks_us()
+        read_cb(driver.drv, data)
+        samples[i] = utime.ticks_diff(utime.ticks_us(), start)
+        utime.sleep_ms(1)
+    return benchutil.summarize(samples)
+
+
+def main():
+    # Keep a realistically populated heap so each collection has work to do.
+    live = [bytearray(32) for i in range(2000)]
+    benchutil.report('gc.collect() per call', run(AlwaysCollect()))
+    scheduler = GCScheduler()
+    benchutil.report('GCScheduler', run(scheduler))
+    print('GCScheduler collections: %d (max %dus)' %
+          (scheduler.collections, scheduler.max_collect_us))
+    del live
+
+
+main()
@@ -0,0 +1,31 @@
+# Shared helpers for the host-side benchmarks.  Run the benchmarks from the
+# repository root with the MicroPython unix port, e.g.:
+#
+#     micropython benchmarks/bench_read_cb.py
+import sys
+
+sys.path[:0] = ['benchmarks/stubs', 'micropython-src']
+
+
+def summarize(samples):
+    '''
+    Summarize a sequence of latency samples (in microseconds).
+
+    Returns
+    -------
+    dict
+        ``n``, ``mean``, ``p50``, ``p99`` and ``max`` of the samples.
+    '''
+    ordered = sorted(samples)
+    n = len(ordered)
+    return {'n': n,
+            'mean': sum(ordered) / n,
+            'p50': ordered[n // 2],
+            'p99': ordered[min(n - 1, n * 99 // 100)],
+            'max': ordered[-1]}
+
+
+def report(name, summary):
+    print('%-24s n=%-6d mean=%8.1fus p50=%6dus p99=%6dus max=%6dus' %
+          (name, summary['n'], summary['mean'], summary['p50'],
+           summary['p99'], summary['max']))
@@ -0,0 +1,170 @@
+'''
+Benchmark runner emitting machine-readable results.
+
+Run the suite (from the repository root, with the MicroPython unix port)::
+
+    micropython benchmarks/run.py [results.json]
+
+Compare two result files, exiting non-zero if any metric regressed by more
+than the threshold (in percent, default 10)::
+
+    micropython benchmarks/run.py --compare baseline.json results.json [10]
+
+All metrics are "lower is better".  Display and scene benchmarks need an
+LVGL-enabled unix port; with the stand-in `lvgl` module they are skipped.
+'''
+import benchutil
+
+import array
+import gc
+import json
+import sys
+
+import lvgl as lv
+import machine
+import utime
+
+
+REPEATS = 5
+
+
+def median(values):
+    ordered = sorted(values)
+    return ordered[len(ordered) // 2]
+
+
+class NoCollect:
+    def poll(self, active=False):
+        return False
+
+
+def bench_faces_update(results, updates=10000):
+    from m5_lvgl import FacesEncoderInputEncoder
+
+    i2c = machine.I2C()
+    encoder = FacesEncoderInputEncoder(i2c, gc_scheduler=NoCollect())
+    i2c.set_response(encoder.addr, b'\xff\x01\x00')
+    timings = []
+    allocated = 0
+    for repeat in range(REPEATS):
+        gc.collect()
+        gc.disable()
+        before = gc.mem_alloc()
+        start = utime.ticks_us()
+        for i in range(updates):
+            encoder.update()
+        timings.append(utime.ticks_diff(utime.ticks_us(), start))
+        allocated = max(allocated, gc.mem_alloc() - before)
+        gc.enable()
+    results['faces_update.ns_per_call'] = median(timings) * 1000 // updates
+    results['faces_update.alloc_bytes'] = allocated
+
+
+def bench_read_cb(results, calls=2000):
+    from m5_lvgl import EncoderInputDriver
+
+    class IdleEncoder:
+        diff = 0
+        pressed = False
+
+    driver = EncoderInputDriver(IdleEncoder())
+    read_cb = driver.drv.read_cb
+    data = lv.indev_data_t()
+    samples = array.array('I', bytearray(4 * calls))
+    for i in range(calls):
+        start = utime.ticks_us()
+        read_cb(driver.drv, data)
+        samples[i] = utime.ticks_diff(utime.ticks_us(), start)
+    summary = benchutil.summarize(samples)
+    results['read_cb.p50_us'] = summary['p50']
+    results['read_cb.p99_us'] = summary['p99']
+    results['read_cb.max_us'] = summary['max']
+
+
+def bench_display(results):
+    from m5_lvgl import M5ili9341
+    from scene import build_scene, refresh
+
+    lv.init()
+    disp = M5ili9341(hybrid=False)
+
+    timings = []
+    for repeat in range(REPEATS):
+        start = utime.ticks_us()
+        scr, label = build_scene()
+        timings.append(utime.ticks_diff(utime.ticks_us(), start))
+        refresh(disp)
+    results['scene.build_us'] = median(timings)
+
+    for name, obj in (('full', scr), ('partial', None)):
+        timings = []
+        for repeat in range(REPEATS):
+            if obj is None:
+                # Only the title changes, as on a dashboard.
+                label.set_text('Object usage demo %d' % repeat)
+            start = utime.ticks_us()
+            refresh(disp, obj)
+            timings.append(utime.ticks_diff(utime.ticks_us(), start))
+        results['flush.%s_frame_us' % name] = median(timings)
+        results['flush.%s_frame_bytes' % name] = disp.frame_bytes
+        # A frame boundary missed by the flush path (e.g., `flush_is_last`
+        # read after the transfer completed) shows up here as a merged or
+        # timed out frame.
+        results['flush.%s_frame_areas' % name] = disp.frame_areas
+
+
+def run(path=None):
+    results = {}
+    bench_faces_update(results)
+    bench_read_cb(results)
+    if hasattr(lv, 'disp_drv_t') and hasattr(lv, 'btn'):
+        bench_display(results)
+    else:
+        print('Skipping display benchmarks: no LVGL rendering support.')
+    report = {'platform': sys.platform,
+              'implementation': sys.implementation.name,
+              'results': results}
+    text = json.dumps(report)
+    if path is None:
+        print(text)
+    else:
+        with open(path, 'w') as output:
+            output.write(text)
+        for name in sorted(results):
+            print('%-28s %10d' % (name, results[name]))
+
+
+def compare(baseline_path, current_path, threshold=10):
+    with open(baseline_path) as baseline_file:
+        baseline = json.loads(baseline_file.read())['results']
+    with open(current_path) as current_file:
+        current = json.loads(current_file.read())['results']
+    regressions = 0
+    for name in sorted(baseline):
+        if name not in current:
+            continue
+        before = baseline[name]
+        after = current[name]
+        if before:
+            change = 100 * (after - before) / before
+            regressed = change > threshold
+        else:
+            change = 0 if not after else float('inf')
+            regressed = after > 0
+        regressions += regressed
+        print('%-28s %10d -> %10d %+8.1f%%%s' %
+              (name, before, after, change, '  REGRESSION' if regressed
+               else ''))
+    return regressions
+
+
+def main(args):
+    if args and args[0] == '--compare':
+        threshold = float(args[3]) if len(args) > 3 else 10
+        if compare(args[1], args[2], threshold):
+            sys.exit(1)
+    else:
+        run(args[0] if args else None)
+
+
+main(sys.argv[1:])
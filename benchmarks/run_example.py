@@ -0,0 +1,45 @@
+'''
+Run an example script headless and report frame cost.
+
+Usage (from the repository root, with an LVGL-enabled unix port)::
+
+    micropython benchmarks/run_example.py examples/objects.py [snapshot.ppm]
+'''
+import benchutil
+
+import sys
+
+import lvgl as lv
+import utime
+
+from scene import refresh
+
+
+FRAMES = 20
+
+
+def main(path, snapshot=None):
+    namespace = {'__name__': '__main__'}
+    start = utime.ticks_us()
+    with open(path) as source:
+        exec(source.read(), namespace)
+    setup_us = utime.ticks_diff(utime.ticks_us(), start)
+    disp = namespace['disp']
+    scr = lv.scr_act()
+    refresh(disp, scr)
+    bytes_before = disp.bytes
+    commands_before = disp.commands
+    start = utime.ticks_us()
+    for i in range(FRAMES):
+        refresh(disp, scr)
+    elapsed = utime.ticks_diff(utime.ticks_us(), start)
+    print('%s: setup %dus, %dus/frame, %d SPI bytes/frame, %d commands/frame'
+          % (path, setup_us, elapsed // FRAMES,
+             (disp.bytes - bytes_before) // FRAMES,
+             (disp.commands - commands_before) // FRAMES))
+    if snapshot is not None:
+        disp.snapshot_ppm(snapshot)
+        print('Wrote %s' % snapshot)
+
+
+main(*sys.argv[1:3])
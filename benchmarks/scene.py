@@ -0,0 +1,60 @@
+'''
+Reference scene for display benchmarks, built from the widgets of
+`examples/objects.py`.
+'''
+import lvgl as lv
+
+
+def build_scene():
+    scr = lv.obj()
+    lv.scr_load(scr)
+
+    label = lv.label(scr)
+    label.set_text("Object usage demo")
+    label.set_x(50)
+
+    btn1 = lv.btn(scr)
+    btn1.set_size(btn1.get_width(), 30)
+    btn1.align(label, lv.ALIGN.OUT_BOTTOM_LEFT, 0, 20)
+    lv.label(btn1).set_text("Button 1")
+
+    btn2 = lv.btn(scr)
+    btn2.set_size(btn2.get_width(), 30)
+    btn2.align(btn1, lv.ALIGN.OUT_RIGHT_MID, 50, 0)
+    lv.label(btn2).set_text("Button 2")
+
+    slider = lv.slider(scr)
+    slider.set_size(round(scr.get_width() / 3), slider.get_height())
+    slider.align(btn1, lv.ALIGN.OUT_BOTTOM_LEFT, 0, 20)
+    slider.set_value(30, False)
+
+    ddlist = lv.ddlist(scr)
+    ddlist.align(slider, lv.ALIGN.OUT_RIGHT_TOP, 50, 0)
+    ddlist.set_options("None\nLittle\nHalf\nA lot\nAll")
+
+    chart = lv.chart(scr)
+    chart.set_size(round(scr.get_width() / 2), round(scr.get_width() / 4))
+    chart.align(slider, lv.ALIGN.OUT_BOTTOM_LEFT, 0, 20)
+    chart.set_series_width(3)
+    series = chart.add_series(lv.color_hex(0xFF0000))
+    for value in (10, 25, 45, 80):
+        chart.set_next(series, value)
+    return scr, label
+
+
+def refresh(disp, obj=None, timeout_ms=1000):
+    '''
+    Invalidate `obj` (if given) and run LVGL until `disp` has flushed a new
+    frame.
+    '''
+    import utime
+
+    frames = disp.frames
+    if obj is not None:
+        obj.invalidate()
+    start = utime.ticks_ms()
+    while disp.frames == frames:
+        if utime.ticks_diff(utime.ticks_ms(), start) > timeout_ms:
+            raise RuntimeError('No frame flushed within %dms.' % timeout_ms)
+        lv.tick_inc(5)
+        lv.task_handler()
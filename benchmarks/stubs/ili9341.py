@@ -0,0 +1,5 @@
+# Stand-in for the stock `ili9341` display driver: `M5ili9341` then renders
+# into the headless framebuffer and its SPI traffic is counted.
+from m5_lvgl.headless import (HeadlessDisplay as ili9341, COLOR_MODE_RGB,
+                              COLOR_MODE_BGR, MADCTL_MH, MADCTL_ML, MADCTL_MV,
+                              MADCTL_MX, MADCTL_MY)
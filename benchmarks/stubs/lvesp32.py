@@ -0,0 +1,2 @@
+# Stand-in for `lvesp32`; on the unix port nothing drives `lv.task_handler`
+# from a hardware timer, so benchmarks call it explicitly.
@@ -0,0 +1,82 @@
+# Minimal stand-in for the `lvgl` module, enough to construct the m5_lvgl
+# input drivers on the MicroPython unix port.  A firmware built with LVGL
+# provides `lvgl` as a built-in module, which takes precedence over this file.
+
+
+class INDEV_STATE:
+    REL = 0
+    PR = 1
+
+
+class INDEV_TYPE:
+    NONE = 0
+    POINTER = 1
+    KEYPAD = 2
+    BUTTON = 3
+    ENCODER = 4
+
+
+class EVENT:
+    PRESSED = 0
+    PRESSING = 1
+    PRESS_LOST = 2
+    SHORT_CLICKED = 3
+    LONG_PRESSED = 4
+    LONG_PRESSED_REPEAT = 5
+    CLICKED = 6
+    RELEASED = 7
+    DRAG_BEGIN = 8
+    DRAG_END = 9
+    DRAG_THROW_BEGIN = 10
+    KEY = 11
+    FOCUSED = 12
+    DEFOCUSED = 13
+    VALUE_CHANGED = 14
+    INSERT = 15
+    REFRESH = 16
+    APPLY = 17
+    CANCEL = 18
+    DELETE = 19
+
+
+class indev_data_t:
+    def __init__(self):
+        self.state = INDEV_STATE.REL
+        self.enc_diff = 0
+
+
+class indev_drv_t:
+    def __init__(self):
+        self.type = INDEV_TYPE.NONE
+        self.read_cb = None
+
+
+class indev_t:
+    def __init__(self, drv):
+        self.driver = drv
+        self.group = None
+
+
+def init():
+    pass
+
+
+def indev_drv_init(drv):
+    drv.type = INDEV_TYPE.NONE
+    drv.read_cb = None
+
+
+def indev_drv_register(drv):
+    return indev_t(drv)
+
+
+def indev_set_group(indev, group):
+    indev.group = group
+
+
+def tick_inc(ms):
+    pass
+
+
+def task_handler():
+    pass
@@ -1,4 +1,46 @@
-import lvgl as lv
-import lvesp32
+# Public names and the modules defining them.  Each module is only imported
+# the first time one of its names is accessed (see `__getattr__`), so, e.g.,
+# an application using only the buttons does not load the display driver.
+#
+# MicroPython's `from m5_lvgl import *` ignores `__all__` and only binds
+# names already loaded, i.e., none: star-import from `m5_lvgl.driver`
+# instead, or import names explicitly.
+_LAZY = {
+    'M5ili9341': 'display',
+    'ButtonsInputEncoder': 'buttons',
+    'FacesEncoderInputEncoder': 'faces',
+    'EncoderInputDriver': 'indev',
+    'general_event_handler': 'event_log',
+    'GCScheduler': 'gc_scheduler',
+    'EventRing': 'event_ring',
+    'LatencyTracer': 'trace',
+    'EventLog': 'event_log',
+    'default_log': 'event_log',
+    'make_event_handler': 'event_log',
+    'EventBus': 'event_bus',
+    'TaskLoop': 'task_loop',
+    'LedAnimation': 'led_animation',
+    'LedAnimator': 'led_animation',
+    'I2CBus': 'i2c_bus',
+    'Timeline': 'timeline',
+}
 
-from .driver import *
\ No newline at end of file
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    source = _LAZY.get(name)
+    if source is None:
+        # MicroPython resolves `from m5_lvgl import <submodule>` through this
+        # function, without falling back to importing the submodule.
+        try:
+            return __import__(__name__ + '.' + name, None, None, (name, ))
+        except ImportError:
+            raise AttributeError(name)
+    module = __import__(__name__ + '.' + source, None, None, (name, ))
+    # Cache every public name of the module, so later accesses skip
+    # `__getattr__`.
+    for key in _LAZY:
+        if _LAZY[key] == source:
+            globals()[key] = getattr(module, key)
+    return globals()[name]
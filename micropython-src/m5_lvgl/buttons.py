@@ -0,0 +1,142 @@
+import machine
+import utime
+
+from .counter import _COUNT_MASK, _count_diff
+from .event_ring import (EventRing, EVENT_LEFT, EVENT_RIGHT, EVENT_PRESS,
+                         EVENT_RELEASE)
+
+
+__all__ = ['ButtonsInputEncoder']
+
+
+class ButtonsInputEncoder:
+    def __init__(self, left=39, right=38, press=37, debounce_ms=20,
+                 event_capacity=32, tracer=None):
+        # `_left`/`_right` are only ever written by the IRQ handlers and
+        # `_left_read`/`_right_read` only by `diff`, so a step counted while
+        # `diff` runs is picked up by the next read instead of being lost.
+        self._left = 0
+        self._right = 0
+        self._left_read = 0
+        self._right_read = 0
+        # Accepted edges, in order and timestamped, for consumers that need
+        # more than the coalesced `diff`/`pressed` state.
+        self.events = EventRing(event_capacity)
+        # Optional `LatencyTracer`, stamped on every accepted edge.
+        self.tracer = tracer
+        # Optional callable (e.g., `TaskLoop.wake`) called on every accepted
+        # edge; it must not allocate.
+        self.on_input = None
+        self._pressed = False
+        # An edge is only accepted after `debounce_ms` without any edge on the
+        # same button; anything sooner is contact bounce.  Edges that do not
+        # change the button state (e.g., a falling edge read back high) are
+        # glitches.  Both are rejected and counted.
+        self.debounce_ms = debounce_ms
+        self.rejected_left = 0
+        self.rejected_right = 0
+        self.rejected_press = 0
+        self._left_down = False
+        self._right_down = False
+        settled = utime.ticks_add(utime.ticks_ms(), -debounce_ms)
+        self._left_time = settled
+        self._right_time = settled
+        self._press_time = settled
+
+        def on_toggle_left(pin):
+            now = utime.ticks_ms()
+            elapsed = utime.ticks_diff(now, self._left_time)
+            self._left_time = now
+            down = not pin.value()
+            if elapsed < self.debounce_ms or down == self._left_down:
+                self.rejected_left += 1
+                return
+            self._left_down = down
+            if down:
+                self._left = (self._left + 1) & _COUNT_MASK
+                self.events.push(now, EVENT_LEFT)
+                if self.tracer is not None:
+                    self.tracer.capture()
+                if self.on_input is not None:
+                    self.on_input()
+
+        def on_toggle_right(pin):
+            now = utime.ticks_ms()
+            elapsed = utime.ticks_diff(now, self._right_time)
+            self._right_time = now
+            down = not pin.value()
+            if elapsed < self.debounce_ms or down == self._right_down:
+                self.rejected_right += 1
+                return
+            self._right_down = down
+            if down:
+                self._right = (self._right + 1) & _COUNT_MASK
+                self.events.push(now, EVENT_RIGHT)
+                if self.tracer is not None:
+                    self.tracer.capture()
+                if self.on_input is not None:
+                    self.on_input()
+
+        def on_toggle_press(pin):
+            now = utime.ticks_ms()
+            elapsed = utime.ticks_diff(now, self._press_time)
+            self._press_time = now
+            pressed = not pin.value()
+            if elapsed < self.debounce_ms or pressed == self._pressed:
+                self.rejected_press += 1
+                return
+            self._pressed = pressed
+            self.events.push(now, EVENT_PRESS if pressed else EVENT_RELEASE)
+            if self.tracer is not None:
+                self.tracer.capture()
+            if self.on_input is not None:
+                self.on_input()
+
+        both_edges = machine.Pin.IRQ_FALLING | machine.Pin.IRQ_RISING
+        btn_left = machine.Pin(left, machine.Pin.IN, machine.Pin.PULL_UP)
+        btn_left.irq(trigger=both_edges, handler=on_toggle_left)
+        btn_right = machine.Pin(right, machine.Pin.IN, machine.Pin.PULL_UP)
+        btn_right.irq(trigger=both_edges, handler=on_toggle_right)
+        btn_press = machine.Pin(press, machine.Pin.IN, machine.Pin.PULL_UP)
+        btn_press.irq(trigger=both_edges, handler=on_toggle_press)
+        self._btn_left = btn_left
+        self._btn_right = btn_right
+        self._btn_press = btn_press
+
+    def _settle(self):
+        # The last edge of a bounce train may have been rejected; once the
+        # debounce window has passed, trust the settled pin levels.  This only
+        # resynchronizes state and never counts a step.
+        now = utime.ticks_ms()
+        if utime.ticks_diff(now, self._left_time) >= self.debounce_ms:
+            self._left_down = not self._btn_left.value()
+        if utime.ticks_diff(now, self._right_time) >= self.debounce_ms:
+            self._right_down = not self._btn_right.value()
+        if utime.ticks_diff(now, self._press_time) >= self.debounce_ms:
+            self._pressed = not self._btn_press.value()
+
+    @property
+    def rejected(self):
+        return self.rejected_left + self.rejected_right + self.rejected_press
+
+    @property
+    def diff_peek(self):
+        return (_count_diff(self._right, self._right_read) -
+                _count_diff(self._left, self._left_read))
+
+    @property
+    def diff(self):
+        self._settle()
+        # Snapshot each counter exactly once.
+        left = self._left
+        right = self._right
+        diff = (_count_diff(right, self._right_read) -
+                _count_diff(left, self._left_read))
+        self._left_read = left
+        self._right_read = right
+        return diff
+
+    @property
+    def pressed(self):
+        self._settle()
+        return self._pressed
@@ -0,0 +1,9 @@
+# Step counters wrap within the small int range, so IRQ handlers never
+# allocate a long int.
+_COUNT_MASK = 0x3FFFFFFF
+_COUNT_HALF = 0x20000000
+
+
+def _count_diff(count, read):
+    # Steps between two snapshots of a wrapping step counter.
+    return ((count - read + _COUNT_HALF) & _COUNT_MASK) - _COUNT_HALF
@@ -0,0 +1,599 @@
+import gc
+
+import lvgl as lv
+import machine
+import utime
+
+from ili9341 import ili9341, COLOR_MODE_BGR, MADCTL_ML
+
+try:
+    import esp
+except ImportError:
+    # Not running on an ESP32 (e.g., the unix port).
+    esp = None
+
+from . import timeline as _timeline
+
+
+__all__ = ['M5ili9341', 'BUFFER_LINE_STEPS', 'BUFFER_HEAP_RESERVE']
+
+
+BUFFER_LINE_STEPS = (240, 160, 120, 80, 60, 40, 30, 20, 10)
+# Heap left untouched when auto-sizing draw buffers.
+BUFFER_HEAP_RESERVE = 32 * 1024
+# Largest `send_data()` call made by `blit_splash()` (ESP-IDF's default
+# maximum SPI transfer size).
+SPLASH_CHUNK_BYTES = 4092
+
+
+def _psram_available():
+    get_free = esp and getattr(esp, 'heap_caps_get_free_size', None)
+    if get_free is not None:
+        return get_free(esp.MALLOC_CAP.SPIRAM) > 0
+    # On PSRAM builds the MicroPython heap lives in PSRAM and is megabytes
+    # in size; without PSRAM it is well under 128 kB.
+    return gc.mem_free() > 1024 * 1024
+
+
+def _free(buf):
+    # Release a buffer from `esp.heap_caps_malloc()`; other buffers are
+    # garbage collected.
+    free = esp and getattr(esp, 'heap_caps_free', None)
+    if buf and free is not None:
+        free(buf)
+
+
+def _dma_free():
+    # Largest allocatable block of internal DMA-capable RAM, or `None` if the
+    # binding cannot tell.
+    get_largest = esp and getattr(esp, 'heap_caps_get_largest_free_block',
+                                  None)
+    if get_largest is None:
+        return None
+    return get_largest(esp.MALLOC_CAP.DMA)
+
+
+def _soft_reset():
+    # `machine.reset_cause()` is missing on some ports (e.g., unix).
+    reset_cause = getattr(machine, 'reset_cause', None)
+    return (reset_cause is not None and
+            reset_cause() == getattr(machine, 'SOFT_RESET', None))
+
+
+def _fuse_invert(init_cmds, invert):
+    # Set display inversion (on with 0x21, off with 0x20) as part of the
+    # initialization commands, before display on, rather than with a
+    # separate command afterwards.  It is sent explicitly either way: after
+    # a warm start the panel may still be inverted.
+    code = 0x21 if invert else 0x20
+    for cmd in init_cmds:
+        if cmd['cmd'] in (0x20, 0x21):
+            cmd['cmd'] = code
+            return
+    for i, cmd in enumerate(init_cmds):
+        if cmd['cmd'] == 0x29:
+            init_cmds.insert(i, {'cmd': code})
+            return
+    init_cmds.append({'cmd': code})
+
+
+# `lv.disp_flush_is_last` is missing from older LVGL bindings; there every
+# flushed area is treated as the end of a frame.
+_disp_flush_is_last = getattr(lv, 'disp_flush_is_last',
+                              lambda disp_drv: True)
+
+
+class M5ili9341(ili9341):
+    def __init__(
+            self, mosi=23, miso=19, clk=18, cs=14, dc=27, rst=33, backlight=32,
+            backlight_on=1, hybrid=True, width=320, height=240,
+            colormode=COLOR_MODE_BGR, rot=MADCTL_ML, invert=True, tracer=None,
+            buffer_count=None, buffer_lines=None, buffer_psram=False,
+            use_lvesp32=True, warm_start=False, **kwargs):
+        # Optional `LatencyTracer`, closed out once the last area of a frame
+        # has been sent to the panel.
+        self.tracer = tracer
+        # Column/page address window last sent to the panel; `None` forces
+        # the next flush to send both.
+        self._window = None
+        self._window_data = bytearray(4)
+        # LVGL output is dropped while a splash image is held on the panel.
+        self._splash_held = False
+        self._splash_task = None
+        # The stock driver flushes from C (`esp.ili9341_flush`), bypassing
+        # `flush()`, with `hybrid=True` where the binding provides it.
+        self._c_flush = (hybrid and esp is not None and
+                         hasattr(esp, 'ili9341_flush'))
+        # SPI traffic of the Python flush path (command plus data bytes).
+        self.frames = 0
+        self.frame_areas = 0
+        self.frame_bytes = 0
+        self.total_bytes = 0
+        self._areas = 0
+        self._bytes = 0
+        # Per-frame timing of the Python flush path: `render_us` is time
+        # LVGL spent between flush calls (drawing the next area, or waiting
+        # for a busy buffer), `transfer_us` is time from each flush call
+        # until its DMA transfer completed, and `frame_us` spans the first
+        # flush call to the completion of the last transfer of a frame.
+        # With two buffers, rendering overlaps transfers.
+        self.frame_us = 0
+        self.render_us = 0
+        self.transfer_us = 0
+        self._frame_start = 0
+        self._flush_start = 0
+        self._flush_end = 0
+        self._render_us = 0
+        self._transfer_us = 0
+        self._last = False
+        # `True` once the SPI post-transaction callback reports transfer
+        # completion (see `disp_spi_init()`).
+        self._dma_hooked = False
+        # Invert colors.  Sent with the initialization commands by `init()`
+        # (the stock class is passed `invert=False` to work around an issue
+        # with its `invert` kwarg).
+        self._invert = invert
+        # Skip the panel reset and power-up sequence, e.g., after a soft
+        # reset, when the panel is still configured; `'auto'` to warm start
+        # after a soft reset only.
+        if warm_start == 'auto':
+            warm_start = _soft_reset()
+        self.warm_start = warm_start
+        # Time spent in `init()`.
+        self.init_time_ms = 0
+        _timeline.mark('M5ili9341')
+        if use_lvesp32:
+            # Drive `lv.task_handler` from the `lvesp32` hardware timer.  Pass
+            # `use_lvesp32=False` to run LVGL from a `TaskLoop` instead.
+            import lvesp32
+            _timeline.mark('lvesp32')
+        custom_buffers = (buffer_count is not None or
+                          buffer_lines is not None or buffer_psram)
+        if custom_buffers and 'factor' not in kwargs:
+            # The stock buffers are replaced below: keep them to one line, so
+            # they neither take memory from, nor skew the sizing of, ours.
+            kwargs['factor'] = height
+        super().__init__(
+            mosi=mosi, miso=miso, clk=clk, cs=cs, dc=dc, rst=rst,
+            backlight=backlight, backlight_on=backlight_on, hybrid=hybrid,
+            width=width, height=height, colormode=colormode, rot=rot,
+            invert=False, **kwargs)
+        _timeline.mark('driver register')
+        # Mark the end of the first frame on the startup timeline.
+        self._mark_frame = _timeline.active is not None
+        if tracer is not None or self._mark_frame:
+            # LVGL copies the driver on registration: hook the registered
+            # copy.  The monitor callback runs after every refresh, with
+            # either flush path.
+            lv.disp_get_default().driver.monitor_cb = self._monitor
+        if buffer_lines == 'auto':
+            buffer_lines = self.auto_buffer_lines(count=buffer_count or 2,
+                                                  psram=buffer_psram)
+        if custom_buffers:
+            self.init_buffers(count=buffer_count or 2,
+                              lines=buffer_lines or self.height // 4,
+                              psram=buffer_psram)
+            _timeline.mark('init buffers')
+
+    def disp_spi_init(self):
+        super().disp_spi_init()
+        # The stock post-transaction callback of the Python flush path only
+        # calls `lv.disp_flush_ready()`; stand in for it to also time
+        # transfers to their completion.
+        set_cb = esp and getattr(esp, 'spi_transaction_set_cb', None)
+        if set_cb is not None and hasattr(self, 'spi_callbacks'):
+            self.spi_callbacks = set_cb(None, self._flush_isr)
+            self._dma_hooked = True
+        _timeline.mark('spi')
+
+    def init(self):
+        # Called by the stock constructor: sets up SPI and the control pins,
+        # resets the panel and sends `init_cmds`.
+        _timeline.mark('stock setup')
+        start = utime.ticks_ms()
+        _fuse_invert(self.init_cmds, self._invert)
+        if self.warm_start:
+            self._warm_init()
+        else:
+            super().init()
+        self.init_time_ms = utime.ticks_diff(utime.ticks_ms(), start)
+        _timeline.mark('panel init')
+
+    def _warm_init(self):
+        # The panel kept its configuration: set up the host side only, skip
+        # the hardware reset, and resend just the configuration commands
+        # that need no delay (so, e.g., a changed rotation still applies).
+        self.disp_spi_init()
+        if esp is not None:
+            for pin in (self.dc, self.backlight):
+                if pin != -1:
+                    esp.gpio_pad_select_gpio(pin)
+                    esp.gpio_set_direction(pin, esp.GPIO_MODE.OUTPUT)
+        for cmd in self.init_cmds:
+            if 'delay' in cmd:
+                # Sleep out and display on.
+                continue
+            self.send_cmd(cmd['cmd'])
+            if 'data' in cmd:
+                self.send_data(cmd['data'])
+        if esp is not None and self.backlight != -1:
+            esp.gpio_set_level(self.backlight, self.backlight_on)
+
+    def auto_buffer_lines(self, count=2, psram=False,
+                          reserve=BUFFER_HEAP_RESERVE):
+        '''
+        Pick the tallest draw buffer height that fits in free memory.
+
+        Parameters
+        ----------
+        count : int
+            Number of draw buffers that will be allocated.
+        psram : bool
+            Buffers will be allocated from PSRAM.
+        reserve : int
+            Bytes of memory to leave free for the application.
+
+        Returns
+        -------
+        int
+            Buffer height in lines, from :data:`BUFFER_LINE_STEPS`.
+        '''
+        if psram:
+            get_free = esp and getattr(esp, 'heap_caps_get_free_size', None)
+            if get_free is not None:
+                available = get_free(esp.MALLOC_CAP.SPIRAM)
+            else:
+                # Bindings without it: the MicroPython heap shares PSRAM.
+                available = gc.mem_free() // 2
+        else:
+            available = _dma_free()
+            if available is None:
+                # Without PSRAM, DMA buffers compete with the MicroPython
+                # heap for internal RAM; with it, internal RAM is mostly free.
+                if _psram_available():
+                    available = 128 * 1024
+                else:
+                    available = gc.mem_free() // 2
+        line_bytes = self.width * lv.color_t.SIZE * count
+        for lines in BUFFER_LINE_STEPS:
+            if (lines <= self.height and
+                    lines * line_bytes <= available - reserve):
+                return lines
+        return BUFFER_LINE_STEPS[-1]
+
+    def init_buffers(self, count=2, lines=60, psram=False):
+        '''
+        Replace the stock LVGL draw buffers.
+
+        With two buffers LVGL renders into one while the other is sent to the
+        panel by DMA.
+
+        May be called while LVGL is running: rendering is paused while the
+        buffers are swapped.  If the new buffers cannot be allocated, buffers
+        of the old size are restored and `MemoryError` is raised; if even
+        those cannot be allocated, LVGL is left rendering through a single
+        one-line buffer (slowly) until :meth:`init_buffers` succeeds.
+
+        Parameters
+        ----------
+        count : int
+            Number of draw buffers (1 or 2).
+        lines : int
+            Height of each buffer in display lines.
+        psram : bool
+            Allocate from PSRAM instead of internal DMA-capable RAM.  This
+            frees internal RAM, but the SPI driver then copies each area
+            through a bounce buffer before DMA.
+        '''
+        if count not in (1, 2):
+            raise ValueError('`count` must be 1 or 2.')
+        px = self.width * lines
+        size = px * lv.color_t.SIZE
+        # Keep LVGL from rendering into (or flushing) the buffers while they
+        # are swapped, and let the transfer in flight, if any, complete.
+        task = None if self._splash_held else self._refresh_task()
+        if task is not None:
+            task.set_prio(lv.TASK_PRIO.OFF)
+        while self.disp_buf.flushing:
+            pass
+        # Last resort if no draw buffers can be allocated once the old ones
+        # are freed: freed memory must never stay registered with LVGL.
+        spare = bytearray(self.width * lv.color_t.SIZE)
+        # Free the old buffers first, so the new ones may reuse their memory.
+        old_count = 2 if getattr(self, 'buf2', None) else 1
+        old_size = getattr(self, 'buf_size', size)
+        _free(getattr(self, 'buf1', None))
+        _free(getattr(self, 'buf2', None))
+        self.buf1 = self.buf2 = None
+        buffers = self._alloc_buffers(count, size, psram)
+        if buffers is None:
+            # Fall back to buffers as large as the old ones.
+            buffers = self._alloc_buffers(old_count, old_size,
+                                          getattr(self, 'buffer_psram',
+                                                  False))
+            if buffers is not None:
+                self._set_buffers(buffers, old_size)
+            else:
+                self._set_buffers((spare, None), len(spare))
+                self.buffer_count = 1
+                self.buffer_lines = 1
+                self.buffer_psram = False
+            if task is not None:
+                task.set_prio(lv.TASK_PRIO.MID)
+            raise MemoryError('Could not allocate %d x %d byte draw buffers.'
+                              % (count, size))
+        self._set_buffers(buffers, size)
+        self.buffer_count = count
+        self.buffer_lines = lines
+        self.buffer_psram = psram
+        if task is not None:
+            task.set_prio(lv.TASK_PRIO.MID)
+
+    def _alloc_buffers(self, count, size, psram):
+        # Returns `(buf1, buf2)`, or `None` if either allocation failed.
+        if esp is None:
+            try:
+                return (bytearray(size),
+                        bytearray(size) if count == 2 else None)
+            except MemoryError:
+                return None
+        caps = esp.MALLOC_CAP.SPIRAM if psram else esp.MALLOC_CAP.DMA
+        buf1 = esp.heap_caps_malloc(size, caps)
+        buf2 = None
+        if buf1 and count == 2:
+            buf2 = esp.heap_caps_malloc(size, caps)
+            if not buf2:
+                _free(buf1)
+                buf1 = None
+        return (buf1, buf2) if buf1 else None
+
+    def _set_buffers(self, buffers, size):
+        # Reinitialize the registered buffer descriptor in place.
+        self.buf1, self.buf2 = buffers
+        self.buf_size = size
+        lv.disp_buf_init(self.disp_buf, self.buf1, self.buf2,
+                         size // lv.color_t.SIZE)
+
+    @property
+    def frame_bytes_saved(self):
+        '''
+        SPI bytes the last frame saved compared to a full-screen flush.
+        '''
+        return self.width * self.height * 2 + 11 - self.frame_bytes
+
+    def _send_window(self, x1, y1, x2, y2):
+        # Only resend the column (CASET) or page (RASET) range if it differs
+        # from what the panel already holds; consecutive strips of one area
+        # share their columns, for instance.
+        window = self._window
+        data = self._window_data
+        sent = 0
+        if window is None or window[0] != x1 or window[2] != x2:
+            data[0] = x1 >> 8
+            data[1] = x1 & 0xFF
+            data[2] = x2 >> 8
+            data[3] = x2 & 0xFF
+            self.send_cmd(0x2A)
+            self.send_data(data)
+            sent += 5
+        if window is None or window[1] != y1 or window[3] != y2:
+            data[0] = y1 >> 8
+            data[1] = y1 & 0xFF
+            data[2] = y2 >> 8
+            data[3] = y2 & 0xFF
+            self.send_cmd(0x2B)
+            self.send_data(data)
+            sent += 5
+        self._window = (x1, y1, x2, y2)
+        return sent
+
+    def blit_splash(self, image, rle=False, x=0, y=0, width=None,
+                    height=None, hold=True):
+        '''
+        Draw an RGB565 image straight to the panel, e.g., a splash screen
+        shown while the first LVGL screen is built.
+
+        Parameters
+        ----------
+        image : bytes or stream
+            Pixels row by row, 2 bytes each, high byte first; or, with
+            ``rle``, runs of 3 bytes: a repeat count (1-255), then the pixel.
+            Large images can be read from an open file in chunks.
+        rle : bool
+            ``image`` is run-length encoded.
+        x, y : int
+            Top-left corner of the image on the panel.
+        width, height : int
+            Image size; defaults to the rest of the panel.
+        hold : bool
+            Keep LVGL from drawing over the image until
+            :meth:`release_splash`.
+
+        Raises
+        ------
+        RuntimeError
+            If ``hold`` is set but LVGL cannot be held: with the C flush of
+            ``hybrid=True`` on bindings that do not expose the refresh task.
+        '''
+        if width is None:
+            width = self.width - x
+        if height is None:
+            height = self.height - y
+        if hold:
+            self._hold_splash()
+        # The C flush of `hybrid=True` moves the panel window without
+        # updating the cache: always send it.
+        self._window = None
+        self._send_window(x, y, x + width - 1, y + height - 1)
+        self.send_cmd(0x2C)
+        chunk = bytearray(SPLASH_CHUNK_BYTES)
+        readinto = getattr(image, 'readinto', None)
+        if rle:
+            if readinto:
+                runs = bytearray(3 * 128)
+                view = memoryview(runs)
+                filled = 0
+                # Bytes of a run split across reads, moved to the front.
+                carry = 0
+                while True:
+                    size = readinto(view[carry:])
+                    if not size:
+                        break
+                    size += carry
+                    whole = size - size % 3
+                    filled = self._send_runs(runs, whole, chunk, filled)
+                    carry = size - whole
+                    view[:carry] = view[whole:size]
+            else:
+                filled = self._send_runs(image, len(image), chunk, 0)
+            if filled:
+                self.send_data(memoryview(chunk)[:filled])
+        elif readinto:
+            while True:
+                size = readinto(chunk)
+                if not size:
+                    break
+                self.send_data(chunk if size == SPLASH_CHUNK_BYTES else
+                               memoryview(chunk)[:size])
+        else:
+            image = memoryview(image)
+            for start in range(0, len(image), SPLASH_CHUNK_BYTES):
+                self.send_data(image[start:start + SPLASH_CHUNK_BYTES])
+
+    def _send_runs(self, runs, size, chunk, filled):
+        # Expand `(count, high, low)` runs into `chunk`, sending it whenever
+        # it is full; returns the number of bytes left in `chunk`.
+        view = memoryview(chunk)
+        for i in range(0, size - 2, 3):
+            count = runs[i]
+            while count:
+                n = min(count, (SPLASH_CHUNK_BYTES - filled) // 2)
+                # Write one pixel, then double it up to `n` pixels.
+                chunk[filled] = runs[i + 1]
+                chunk[filled + 1] = runs[i + 2]
+                done = 2
+                while done < 2 * n:
+                    step = min(done, 2 * n - done)
+                    end = filled + done
+                    view[end:end + step] = view[filled:filled + step]
+                    done += step
+                filled += 2 * n
+                count -= n
+                if filled == SPLASH_CHUNK_BYTES:
+                    self.send_data(chunk)
+                    filled = 0
+        return filled
+
+    def _hold_splash(self):
+        if self._splash_held:
+            return
+        # Pause LVGL's refresh task: nothing is drawn (or flushed) until the
+        # splash is released.  Bindings that do not expose the task only
+        # hold the Python flush path (`hybrid=False`), which drops areas.
+        task = self._refresh_task()
+        if task is None and self._c_flush:
+            raise RuntimeError('Cannot hold the splash image: LVGL refresh '
+                               'task not exposed; use `hybrid=False`.')
+        if task is not None:
+            task.set_prio(lv.TASK_PRIO.OFF)
+        self._splash_task = task
+        self._splash_held = True
+
+    def _refresh_task(self):
+        # LVGL's refresh task of this display, or `None` where the binding
+        # does not expose it.
+        return getattr(lv.disp_get_default(), 'refr_task', None)
+
+    @property
+    def splash_held(self):
+        return self._splash_held
+
+    def release_splash(self):
+        '''
+        Let LVGL draw over the splash image: the whole active screen is
+        redrawn on the next refresh.
+        '''
+        if not self._splash_held:
+            return
+        self._splash_held = False
+        if self._splash_task is not None:
+            self._splash_task.set_prio(lv.TASK_PRIO.MID)
+            self._splash_task = None
+        lv.scr_act().invalidate()
+
+    def flush(self, disp_drv, area, color_p):
+        # Used as the flush callback when `hybrid=False`.  LVGL has already
+        # joined overlapping invalidated areas, so each call pushes one
+        # minimal rectangle.
+        if self._splash_held:
+            # Keep the splash image on the panel.
+            lv.disp_flush_ready(disp_drv)
+            return
+        start = utime.ticks_us()
+        # Check before the transfer completes; `lv.disp_flush_ready()` clears
+        # the flag.
+        last = _disp_flush_is_last(disp_drv)
+        if self._areas == 0:
+            self._frame_start = start
+        else:
+            self._render_us += utime.ticks_diff(start, self._flush_end)
+        x1 = area.x1
+        y1 = area.y1
+        x2 = area.x2
+        y2 = area.y2
+        sent = self._send_window(x1, y1, x2, y2)
+        size = (x2 - x1 + 1) * (y2 - y1 + 1) * 2
+        self.send_cmd(0x2C)
+        self._areas += 1
+        self._bytes += sent + 1 + size
+        self.total_bytes += sent + 1 + size
+        if (self._areas == 1 and not self.frames and
+                _timeline.active is not None):
+            _timeline.active.mark('first flush')
+        # The transfer may complete before `send_data_dma()` returns: settle
+        # everything `_transfer_done()` reads first.
+        self._flush_start = start
+        self._last = last
+        # Completion calls `lv.disp_flush_ready()` from the DMA callback.
+        self.send_data_dma(color_p.__dereference__(size))
+        if not self._dma_hooked:
+            # Headless, the transfer is complete; otherwise, only timed
+            # until started.
+            self._transfer_done()
+        self._flush_end = utime.ticks_us()
+
+    def _flush_isr(self, spi_transaction_ptr):
+        # Called in ISR context when the DMA transfer of an area completes.
+        self._transfer_done()
+        lv.disp_flush_ready(self.disp_drv)
+
+    def _transfer_done(self):
+        # May run in ISR context: must not allocate.
+        end = utime.ticks_us()
+        self._transfer_us += utime.ticks_diff(end, self._flush_start)
+        if self._last:
+            self.frames += 1
+            self.frame_areas = self._areas
+            self.frame_bytes = self._bytes
+            self.frame_us = utime.ticks_diff(end, self._frame_start)
+            self.render_us = self._render_us
+            self.transfer_us = self._transfer_us
+            self._areas = 0
+            self._bytes = 0
+            self._render_us = 0
+            self._transfer_us = 0
+
+    def _monitor(self, disp_drv, time, px):
+        # Called by LVGL at the end of each refresh, once the last area has
+        # been handed to the flush callback.  Its DMA transfer may still be
+        # running: wait for `lv.disp_flush_ready()`, as LVGL itself does
+        # before reusing a draw buffer.
+        if self.tracer is None and not self._mark_frame:
+            return
+        while self.disp_buf.flushing:
+            pass
+        if self._mark_frame:
+            self._mark_frame = False
+            _timeline.mark('first frame')
+        if self.tracer is not None:
+            self.tracer.flushed()
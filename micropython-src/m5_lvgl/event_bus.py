@@ -0,0 +1,143 @@
+import lvgl as lv
+import uasyncio as asyncio
+
+
+__all__ = ['EventBus', 'QUEUE', 'COALESCE', 'SHED']
+
+
+# Per-event posting policies.
+# Always queue (dropped only if the bus is full).
+QUEUE = 0
+# Queue unless the same event for the same object is already queued; the
+# consumer reads the object's state when it handles the event anyway.
+COALESCE = 1
+# Queue only while the bus is less than half full, keeping room for discrete
+# events (e.g., clicks) when the consumer falls behind.
+SHED = 2
+
+
+class EventBus:
+    '''
+    Decouple LVGL event callbacks from application work.
+
+    Register ``bus.callback`` with ``obj.set_event_cb()``: posting stores the
+    object and event code in preallocated slots and returns immediately.
+    Application code consumes events from a ``uasyncio`` coroutine with
+    :meth:`get`, or with a handler run by :meth:`start`.
+
+    Parameters
+    ----------
+    capacity : int
+        Number of slots; at most ``capacity - 1`` events are queued and
+        further events are dropped and counted in ``dropped``.
+    policies : dict
+        Posting policy (:data:`QUEUE`, :data:`COALESCE` or :data:`SHED`) by
+        ``lv.EVENT`` code; events not listed are queued.
+    '''
+    def __init__(self, capacity=16, policies=None):
+        if policies is None:
+            policies = {lv.EVENT.VALUE_CHANGED: COALESCE,
+                        lv.EVENT.PRESSING: SHED}
+        self.capacity = capacity
+        self.policies = policies
+        self._objs = [None] * capacity
+        self._events = bytearray(capacity)
+        # Single producer (`post`) and single consumer (`get*`): each only
+        # writes its own index.
+        self._head = 0
+        self._tail = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.shed = 0
+        self._consume_task_id = 0
+        self._consuming = False
+        # Bound once, so registering and posting do not allocate.
+        self.callback = self.post
+
+    def __len__(self):
+        return (self._head - self._tail) % self.capacity
+
+    def post(self, obj, event):
+        policy = self.policies.get(event, QUEUE)
+        head = self._head
+        if policy == COALESCE:
+            i = self._tail
+            while i != head:
+                if self._events[i] == event and self._objs[i] is obj:
+                    self.coalesced += 1
+                    return
+                i += 1
+                if i == self.capacity:
+                    i = 0
+        elif policy == SHED and 2 * len(self) >= self.capacity:
+            self.shed += 1
+            return
+        next_head = head + 1
+        if next_head == self.capacity:
+            next_head = 0
+        if next_head == self._tail:
+            self.dropped += 1
+            return
+        self._objs[head] = obj
+        self._events[head] = event
+        self._head = next_head
+
+    def get_nowait(self):
+        '''
+        Returns
+        -------
+        tuple
+            Oldest queued ``(obj, event)``, or ``None`` if the bus is empty.
+        '''
+        tail = self._tail
+        if tail == self._head:
+            return None
+        item = (self._objs[tail], self._events[tail])
+        # Do not keep the object alive from the ring.
+        self._objs[tail] = None
+        tail += 1
+        if tail == self.capacity:
+            tail = 0
+        self._tail = tail
+        return item
+
+    async def get(self, poll_ms=10):
+        '''
+        Wait for and return the oldest queued ``(obj, event)``.
+        '''
+        while True:
+            item = self.get_nowait()
+            if item is not None:
+                return item
+            await asyncio.sleep_ms(poll_ms)
+
+    def start(self, handler, loop=None, poll_ms=10):
+        '''
+        Call ``handler(obj, event)`` for each queued event on the
+        ``uasyncio`` loop; ``handler`` may be a coroutine function.
+        '''
+        if self._consuming:
+            return
+        if loop is None:
+            loop = asyncio.get_event_loop()
+        self._consuming = True
+        self._consume_task_id += 1
+        loop.create_task(self._consume(self._consume_task_id, handler,
+                                       poll_ms))
+
+    def stop(self):
+        self._consuming = False
+
+    async def _consume(self, task_id, handler, poll_ms):
+        while self._consuming and task_id == self._consume_task_id:
+            item = self.get_nowait()
+            if item is None:
+                await asyncio.sleep_ms(poll_ms)
+                continue
+            result = handler(*item)
+            if hasattr(result, 'send'):
+                # Coroutine handler.
+                await result
+            else:
+                # Let other tasks (e.g., input polling) run between events.
+                await asyncio.sleep_ms(0)
@@ -0,0 +1,110 @@
+import lvgl as lv
+import uasyncio as asyncio
+import utime
+
+from .event_ring import EventRing
+
+
+__all__ = ['EVENT_NAMES', 'EventLog', 'make_event_handler', 'default_log',
+           'general_event_handler']
+
+
+# Names of the events logged by `general_event_handler`, by `lv.EVENT` code.
+EVENT_NAMES = {lv.EVENT.PRESSED: 'Pressed',
+               lv.EVENT.SHORT_CLICKED: 'Short clicked',
+               lv.EVENT.CLICKED: 'Clicked',
+               lv.EVENT.LONG_PRESSED: 'Long press',
+               lv.EVENT.LONG_PRESSED_REPEAT: 'Long press repeat',
+               lv.EVENT.RELEASED: 'Released',
+               lv.EVENT.DRAG_BEGIN: 'Drag begin',
+               lv.EVENT.DRAG_END: 'Drag end',
+               lv.EVENT.DRAG_THROW_BEGIN: 'Drag throw begin',
+               lv.EVENT.FOCUSED: 'Focused',
+               lv.EVENT.DEFOCUSED: 'Defocused'}
+
+
+class EventLog:
+    '''
+    Deferred log of LVGL events.
+
+    Recording only stores a timestamp and the event code in a preallocated
+    ring, so it is safe on the render path; printing happens in
+    :meth:`drain`, called on demand or from a low-priority ``uasyncio`` task
+    (see :meth:`start`).
+
+    Parameters
+    ----------
+    capacity : int
+        Ring size; events recorded while the ring is full are dropped and
+        counted in ``events.overflows``.
+    names : dict
+        Event names by ``lv.EVENT`` code.
+    '''
+    def __init__(self, capacity=64, names=EVENT_NAMES):
+        self.events = EventRing(capacity)
+        self.names = names
+        self._drain_task_id = 0
+        self._draining = False
+
+    def record(self, event):
+        self.events.push(utime.ticks_ms(), event)
+
+    def drain(self, limit=None):
+        '''
+        Print (up to ``limit``) recorded events, oldest first.
+
+        Returns
+        -------
+        int
+            Number of events printed.
+        '''
+        events = self.events
+        count = 0
+        while len(events) and (limit is None or count < limit):
+            code = events.pop()
+            print('[%d] %s' % (events.time, self.names.get(code, code)))
+            count += 1
+        return count
+
+    def start(self, loop=None, period_ms=250, batch=8):
+        '''
+        Drain up to ``batch`` events every ``period_ms`` on the ``uasyncio``
+        loop.
+        '''
+        if self._draining:
+            return
+        if loop is None:
+            loop = asyncio.get_event_loop()
+        self._draining = True
+        self._drain_task_id += 1
+        loop.create_task(self._drain(self._drain_task_id, period_ms, batch))
+
+    def stop(self):
+        self._draining = False
+
+    async def _drain(self, task_id, period_ms, batch):
+        while self._draining and task_id == self._drain_task_id:
+            self.drain(batch)
+            await asyncio.sleep_ms(period_ms)
+
+
+def make_event_handler(log):
+    '''
+    Returns
+    -------
+    function
+        LVGL event callback recording events named in ``log.names`` to
+        ``log``.
+    '''
+    names = log.names
+
+    def event_handler(obj, event):
+        if event in names:
+            log.record(event)
+
+    return event_handler
+
+
+# Log recorded by `general_event_handler`.
+default_log = EventLog()
+general_event_handler = make_event_handler(default_log)
@@ -0,0 +1,75 @@
+import array
+
+
+__all__ = ['EventRing', 'EVENT_NONE', 'EVENT_LEFT', 'EVENT_RIGHT',
+           'EVENT_PRESS', 'EVENT_RELEASE']
+
+
+EVENT_NONE = 0
+EVENT_LEFT = 1
+EVENT_RIGHT = 2
+EVENT_PRESS = 3
+EVENT_RELEASE = 4
+
+
+class EventRing:
+    '''
+    Fixed-capacity ring of ``(timestamp, code)`` input events.
+
+    Safe for a single producer (an IRQ handler calling :meth:`push`) and a
+    single consumer (calling :meth:`pop`): each side only writes its own
+    index, and :meth:`push` does not allocate on the heap.  When full, new
+    events are dropped and counted in ``overflows``.
+
+    Parameters
+    ----------
+    capacity : int
+        Number of slots; at most ``capacity - 1`` events are queued.
+    '''
+    def __init__(self, capacity=32):
+        self.capacity = capacity
+        self._times = array.array('I', bytearray(4 * capacity))
+        self._codes = bytearray(capacity)
+        self._head = 0
+        self._tail = 0
+        self.overflows = 0
+        # Timestamp of the event most recently returned by `pop()`.
+        self.time = 0
+
+    def __len__(self):
+        return (self._head - self._tail) % self.capacity
+
+    def push(self, timestamp, code):
+        head = self._head
+        next_head = head + 1
+        if next_head == self.capacity:
+            next_head = 0
+        if next_head == self._tail:
+            self.overflows += 1
+            return False
+        self._times[head] = timestamp
+        self._codes[head] = code
+        self._head = next_head
+        return True
+
+    def pop(self):
+        '''
+        Returns
+        -------
+        int
+            Code of the oldest queued event (its timestamp is stored in
+            ``time``), or ``EVENT_NONE`` if the ring is empty.
+        '''
+        tail = self._tail
+        if tail == self._head:
+            return EVENT_NONE
+        code = self._codes[tail]
+        self.time = self._times[tail]
+        tail += 1
+        if tail == self.capacity:
+            tail = 0
+        self._tail = tail
+        return code
+
+    def clear(self):
+        self._tail = self._head
@@ -0,0 +1,304 @@
+import machine
+import uasyncio as asyncio
+import utime
+
+from . import gc_scheduler as _gc_scheduler
+from .counter import _COUNT_MASK, _count_diff
+
+
+DEFAULT_ENCODER_ADDR = 0x5E  # (94)
+# Number of LEDs in the Faces encoder ring.
+ENCODER_LED_COUNT = 12
+
+
+__all__ = ['FacesEncoderInputEncoder', 'DEFAULT_ENCODER_ADDR',
+           'ENCODER_LED_COUNT']
+
+
+class FacesEncoderInputEncoder:
+    def __init__(self, i2c, addr=DEFAULT_ENCODER_ADDR, update_period_ms=10,
+                 loop=None, gc_scheduler=None, max_backoff_ms=1000,
+                 int_pin=None, idle_period_ms=None, idle_after_ms=1000,
+                 tracer=None):
+        self.i2c = i2c
+        self.addr = addr
+        self._buffer = bytearray(3)
+        # `_diff` is only written by `update()` and `_diff_read` only by
+        # `diff`, so the poller and the LVGL read callback cannot lose steps.
+        self._diff = 0
+        self._diff_read = 0
+        self._pressed = False
+        self.update_period_ms = update_period_ms
+        self._last_updated = 0
+        self._led_settings = bytearray(4)
+        # Shadow of the LED colours the panel shows (`_leds`) and of the
+        # colours requested but not yet written (`_leds_pending`); bit `i` of
+        # `_leds_dirty` marks LED `i` pending and of `_leds_valid` marks its
+        # shadow as known.
+        self._leds = bytearray(3 * ENCODER_LED_COUNT)
+        self._leds_pending = bytearray(3 * ENCODER_LED_COUNT)
+        self._leds_dirty = 0
+        self._leds_valid = 0
+        self.led_requests = 0
+        self.led_writes = 0
+        # Optional `LatencyTracer`, stamped when a read reports new input.
+        self.tracer = tracer
+        # Optional callable (e.g., `TaskLoop.wake`) called when a read reports
+        # new input.
+        self.on_input = None
+        if gc_scheduler is None:
+            gc_scheduler = _gc_scheduler.scheduler
+        self.gc_scheduler = gc_scheduler
+        if loop is None:
+            loop = asyncio.get_event_loop()
+        self._loop = loop
+        self.max_backoff_ms = max_backoff_ms
+        self.bus_errors = 0
+        self._poll_task_id = 0
+        self._polling = False
+        # `utime.ticks_ms()` deadline of the next poll while polling, so other
+        # bus users (e.g., `LedAnimator`) can keep out of its way.
+        self.next_update = utime.ticks_ms()
+        # Adaptive polling: drop to `idle_period_ms` after `idle_after_ms`
+        # without input (disabled when `idle_period_ms` is `None`).
+        self.idle_period_ms = idle_period_ms
+        self.idle_after_ms = idle_after_ms
+        self._last_active = utime.ticks_ms()
+        # Bus transaction accounting.
+        self.transactions = 0
+        self._rate_start = utime.ticks_ms()
+        self._rate_count = 0
+        self._transactions_per_second = 0
+        # Interrupt mode: only read the panel after its INT line fires.
+        self._int_pending = True
+        if int_pin is None:
+            self._int_pin = None
+        else:
+            def on_interrupt(pin):
+                self._int_pending = True
+
+            self._int_pin = machine.Pin(int_pin, machine.Pin.IN,
+                                        machine.Pin.PULL_UP)
+            self._int_pin.irq(trigger=machine.Pin.IRQ_FALLING,
+                              handler=on_interrupt)
+
+    @property
+    def idle(self):
+        return (utime.ticks_diff(utime.ticks_ms(), self._last_active) >=
+                self.idle_after_ms)
+
+    @property
+    def transactions_per_second(self):
+        '''
+        I2C transactions issued during the last complete one second window.
+        '''
+        self._roll_rate(utime.ticks_ms())
+        return self._transactions_per_second
+
+    def _roll_rate(self, now):
+        elapsed = utime.ticks_diff(now, self._rate_start)
+        if elapsed >= 1000:
+            self._transactions_per_second = ((self.transactions -
+                                              self._rate_count) * 1000 //
+                                             elapsed)
+            self._rate_start = now
+            self._rate_count = self.transactions
+
+    def _count_transaction(self):
+        self.transactions += 1
+        self._roll_rate(utime.ticks_ms())
+
+    @property
+    def polling(self):
+        return self._polling
+
+    def start(self):
+        '''
+        Poll the panel every ``update_period_ms`` on the ``uasyncio`` loop.
+
+        While polling, ``diff`` and ``pressed`` only read cached state, so the
+        LVGL read callback never touches the I2C bus.
+        '''
+        if self._polling:
+            return
+        self._polling = True
+        self._poll_task_id += 1
+        self._loop.create_task(self._poll(self._poll_task_id))
+
+    def stop(self):
+        self._polling = False
+
+    async def _poll(self, task_id):
+        delay_ms = self.update_period_ms
+        due = utime.ticks_ms()
+        while self._polling and task_id == self._poll_task_id:
+            try:
+                if self._int_pending:
+                    if self._int_pin is not None:
+                        # Clear first so an edge during the read re-arms.
+                        self._int_pending = False
+                    self.update()
+            except OSError:
+                self._int_pending = True
+                # Back off exponentially while the bus is failing.
+                self.bus_errors += 1
+                delay_ms = min(2 * delay_ms, self.max_backoff_ms)
+                due = utime.ticks_add(utime.ticks_ms(), delay_ms)
+            else:
+                if self.idle_period_ms is not None and self.idle:
+                    delay_ms = self.idle_period_ms
+                else:
+                    delay_ms = self.update_period_ms
+                # Schedule from the previous deadline, not from now, so the
+                # poll rate does not drift by the time spent in `update()`.
+                due = utime.ticks_add(due, delay_ms)
+            now = utime.ticks_ms()
+            wait_ms = utime.ticks_diff(due, now)
+            if wait_ms < 0:
+                # More than a period behind; resynchronize instead of bursting.
+                due = now
+                wait_ms = 0
+            self.next_update = due
+            await asyncio.sleep_ms(wait_ms)
+
+    def update(self):
+        # Hot path: decode in place so polling does not allocate on the heap.
+        buffer = self._buffer
+        self.i2c.readfrom_into(self.addr, buffer)
+        self._count_transaction()
+        diff = buffer[0]
+        if diff & 0x80:
+            # Sign-extend signed 8-bit step count.
+            diff -= 0x100
+        pressed = not buffer[1]
+        now = utime.ticks_ms()
+        if diff or pressed or pressed != self._pressed:
+            self._last_active = now
+            if diff or pressed != self._pressed:
+                if self.tracer is not None:
+                    self.tracer.capture()
+                if self.on_input is not None:
+                    self.on_input()
+        self._diff = (self._diff + diff) & _COUNT_MASK
+        self._pressed = pressed
+        self._last_updated = now
+        self.gc_scheduler.poll(diff != 0)
+
+    @property
+    def diff(self):
+        total = self._diff
+        value = _count_diff(total, self._diff_read)
+        self._diff_read = total
+        return value
+
+    @property
+    def diff_peek(self):
+        return _count_diff(self._diff, self._diff_read)
+
+    @property
+    def pressed(self):
+        return self._pressed
+
+    @property
+    def led_writes_saved(self):
+        '''
+        LED updates that did not need an I2C write (unchanged or coalesced).
+        '''
+        return self.led_requests - self.led_writes
+
+    def set_led(self, id, colour, flush=True):
+        '''
+        Set the colour of LED ``id`` to ``colour``, an ``(r, g, b)`` tuple.
+
+        The panel is only written if the colour differs from what it already
+        shows.  With ``flush=False`` the write is deferred to :meth:`flush`,
+        so repeated updates of one LED cost a single write.
+        '''
+        offset = 3 * id
+        pending = self._leds_pending
+        pending[offset], pending[offset + 1], pending[offset + 2] = colour
+        self._leds_dirty |= 1 << id
+        self.led_requests += 1
+        if flush:
+            self.flush()
+
+    @property
+    def leds_pending(self):
+        return self._leds_dirty != 0
+
+    def load_leds(self, data, offset=0):
+        '''
+        Set all LEDs from ``3 * ENCODER_LED_COUNT`` bytes of ``data`` (RGB per
+        LED), starting at ``offset``, without allocating.  Call
+        :meth:`flush` to write the LEDs that changed.
+        '''
+        pending = self._leds_pending
+        for i in range(3 * ENCODER_LED_COUNT):
+            pending[i] = data[offset + i]
+        self._leds_dirty = (1 << ENCODER_LED_COUNT) - 1
+        self.led_requests += ENCODER_LED_COUNT
+
+    def set_leds(self, colours, start=0, flush=True):
+        '''
+        Set consecutive LEDs, starting at ``start``, from a sequence of
+        ``(r, g, b)`` colours, writing only LEDs that changed.
+        '''
+        for i, colour in enumerate(colours):
+            self.set_led(start + i, colour, flush=False)
+        if flush:
+            self.flush()
+
+    def flush(self, limit=None):
+        '''
+        Write pending LED colours that differ from what the panel shows.
+
+        Parameters
+        ----------
+        limit : int
+            Write at most this many LEDs; the rest stay pending.
+
+        Returns
+        -------
+        int
+            Number of LEDs written.
+        '''
+        dirty = self._leds_dirty
+        written = 0
+        if not dirty:
+            return written
+        leds = self._leds
+        pending = self._leds_pending
+        settings = self._led_settings
+        for id in range(ENCODER_LED_COUNT):
+            if not dirty & (1 << id):
+                continue
+            if limit is not None and written >= limit:
+                break
+            dirty &= ~(1 << id)
+            offset = 3 * id
+            if (self._leds_valid & (1 << id) and
+                    leds[offset] == pending[offset] and
+                    leds[offset + 1] == pending[offset + 1] and
+                    leds[offset + 2] == pending[offset + 2]):
+                continue
+            settings[0] = id
+            settings[1] = pending[offset]
+            settings[2] = pending[offset + 1]
+            settings[3] = pending[offset + 2]
+            self.i2c.writeto(self.addr, settings)
+            self._count_transaction()
+            self.led_writes += 1
+            leds[offset] = pending[offset]
+            leds[offset + 1] = pending[offset + 1]
+            leds[offset + 2] = pending[offset + 2]
+            self._leds_valid |= 1 << id
+            written += 1
+        self._leds_dirty = dirty
+        return written
+
+    def invalidate_leds(self):
+        '''
+        Forget the LED shadow, e.g., after the panel was power cycled, so the
+        next update of each LED is written.
+        '''
+        self._leds_valid = 0
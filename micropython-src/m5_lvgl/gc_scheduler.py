@@ -0,0 +1,101 @@
+import gc
+
+import utime
+
+
+__all__ = ['GCScheduler', 'scheduler', 'poll']
+
+
+class GCScheduler:
+    '''
+    Run ``gc.collect()`` only when it is worth the stall.
+
+    A collection is triggered when free heap drops below ``threshold`` bytes,
+    or when input has been idle for ``idle_ms`` and memory was allocated since
+    the last collection.  The heap is checked (and collected) at most once
+    per ``budget_ms``: ``gc.mem_free()`` scans the whole allocation table,
+    so :meth:`poll` does not query it while within budget.  Optionally,
+    MicroPython's allocator also collects by itself, without waiting for a
+    poll, once the heap gets close to full (see ``critical``).
+
+    Parameters
+    ----------
+    threshold : int
+        Collect when ``gc.mem_free()`` is below this many bytes.
+    critical : int
+        If given, set the global ``gc.threshold()`` (where available) once,
+        so the allocator collects regardless of budget when less than about
+        this many of the bytes free at construction remain.  The default,
+        ``None``, leaves the application's threshold alone.
+    idle_ms : int
+        Collect opportunistically once input has been idle this long.
+    budget_ms : int
+        Minimum interval between two heap checks (and so collections).
+    '''
+    def __init__(self, threshold=32768, critical=None, idle_ms=250,
+                 budget_ms=1000):
+        self.threshold = threshold
+        self.critical = critical
+        self.idle_ms = idle_ms
+        self.budget_ms = budget_ms
+        now = utime.ticks_ms()
+        self._last_check = now
+        self._last_active = now
+        self._alloc_at_collect = gc.mem_alloc()
+        set_threshold = getattr(gc, 'threshold', None)
+        if critical is not None and set_threshold is not None:
+            # Collect once all but `critical` bytes of the currently free
+            # heap have been allocated since the last collection.
+            set_threshold(max(gc.mem_free() - critical, critical))
+        self.collections = 0
+        self.last_collect_us = 0
+        self.max_collect_us = 0
+
+    def poll(self, active=False):
+        '''
+        Collect garbage if the configured policy calls for it.
+
+        Parameters
+        ----------
+        active : bool
+            ``True`` if the caller just saw user input; postpones idle
+            collections.
+
+        Returns
+        -------
+        bool
+            ``True`` if a collection was run.
+        '''
+        now = utime.ticks_ms()
+        if active:
+            self._last_active = now
+        if utime.ticks_diff(now, self._last_check) < self.budget_ms:
+            return False
+        self._last_check = now
+        if gc.mem_free() < self.threshold:
+            self.collect()
+            return True
+        if (utime.ticks_diff(now, self._last_active) >= self.idle_ms and
+                gc.mem_alloc() > self._alloc_at_collect):
+            self.collect()
+            return True
+        return False
+
+    def collect(self):
+        start = utime.ticks_us()
+        gc.collect()
+        end = utime.ticks_us()
+        self._last_check = utime.ticks_ms()
+        self._alloc_at_collect = gc.mem_alloc()
+        self.collections += 1
+        self.last_collect_us = utime.ticks_diff(end, start)
+        if self.last_collect_us > self.max_collect_us:
+            self.max_collect_us = self.last_collect_us
+
+
+# Shared by all input drivers unless one is passed explicitly.
+scheduler = GCScheduler()
+
+
+def poll(active=False):
+    return scheduler.poll(active)
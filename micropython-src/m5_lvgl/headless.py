@@ -0,0 +1,195 @@
+import lvgl as lv
+import utime
+
+
+__all__ = ['HeadlessDisplay', 'COLOR_MODE_RGB', 'COLOR_MODE_BGR', 'MADCTL_MH',
+           'MADCTL_ML', 'MADCTL_MV', 'MADCTL_MX', 'MADCTL_MY']
+
+
+# Same values as the stock `ili9341` module.
+COLOR_MODE_RGB = 0x00
+COLOR_MODE_BGR = 0x08
+MADCTL_MH = 0x04
+MADCTL_ML = 0x10
+MADCTL_MV = 0x20
+MADCTL_MX = 0x40
+MADCTL_MY = 0x80
+
+
+# `lv.disp_flush_is_last` is missing from older LVGL bindings; there every
+# flushed area is treated as the end of a frame.
+_disp_flush_is_last = getattr(lv, 'disp_flush_is_last',
+                              lambda disp_drv: True)
+
+
+class HeadlessDisplay:
+    '''
+    Display driver rendering into an in-memory RGB565 framebuffer.
+
+    Accepts the same constructor arguments as :class:`M5ili9341` (pin
+    arguments are ignored) and emulates the ILI9341 command interface used by
+    the stock driver (``send_cmd``, ``send_data`` and ``send_data_dma``), so
+    it also stands in for the stock ``ili9341`` class under the unix port.
+    Every command and data byte that would cross the SPI bus is counted.
+    '''
+    def __init__(
+            self, mosi=23, miso=19, clk=18, cs=14, dc=27, rst=33, backlight=32,
+            backlight_on=1, hybrid=True, width=320, height=240,
+            colormode=COLOR_MODE_BGR, rot=MADCTL_ML, invert=True, factor=4,
+            **kwargs):
+        self.width = width
+        self.height = height
+        self.framebuffer = bytearray(width * height * 2)
+        self._framebuffer = memoryview(self.framebuffer)
+        # With LV_COLOR_16_SWAP, LVGL renders pixels big-endian, as sent to
+        # the panel.
+        self._swapped = hasattr(lv.color_t().ch, 'green_l')
+        self.inverted = False
+        self.frames = 0
+        # SPI-equivalent traffic.
+        self.commands = 0
+        self.bytes = 0
+        self._command = None
+        self._columns = (0, width - 1)
+        self._rows = (0, height - 1)
+        self._x = 0
+        self._y = 0
+        self._area_data = bytearray(4)
+
+        self.buf_size = width * height * lv.color_t.SIZE // factor
+        self.buf1 = bytearray(self.buf_size)
+        self.buf2 = bytearray(self.buf_size)
+        self.disp_buf = lv.disp_buf_t()
+        self.disp_drv = lv.disp_drv_t()
+        lv.disp_buf_init(self.disp_buf, self.buf1, self.buf2,
+                         self.buf_size // lv.color_t.SIZE)
+        lv.disp_drv_init(self.disp_drv)
+        self.disp_drv.buffer = self.disp_buf
+        self.disp_drv.flush_cb = self.flush
+        self.disp_drv.hor_res = width
+        self.disp_drv.ver_res = height
+        # Sleep out, then display on; with the delays the panel requires.
+        self.init_cmds = [{'cmd': 0x11, 'delay': 120},
+                          {'cmd': 0x29, 'delay': 120}]
+        if invert:
+            self.init_cmds.append({'cmd': 0x21})
+        self.init()
+        lv.disp_drv_register(self.disp_drv)
+
+    def disp_spi_init(self):
+        pass
+
+    def delay(self, ms):
+        utime.sleep_ms(ms)
+
+    def init(self):
+        self.disp_spi_init()
+        # Hardware reset: wait for the panel to come out of reset.
+        self.delay(5)
+        for cmd in self.init_cmds:
+            self.send_cmd(cmd['cmd'])
+            if 'data' in cmd:
+                self.send_data(cmd['data'])
+            if 'delay' in cmd:
+                self.delay(cmd['delay'])
+
+    def send_cmd(self, cmd):
+        self.commands += 1
+        self.bytes += 1
+        self._command = cmd
+        if cmd == 0x20:
+            self.inverted = False
+        elif cmd == 0x21:
+            self.inverted = True
+        elif cmd == 0x2C:
+            # Memory write restarts at the top-left of the window.
+            self._x = self._columns[0]
+            self._y = self._rows[0]
+
+    def send_data(self, data):
+        self.bytes += len(data)
+        command = self._command
+        if command == 0x2A:
+            self._columns = (data[0] << 8 | data[1], data[2] << 8 | data[3])
+        elif command == 0x2B:
+            self._rows = (data[0] << 8 | data[1], data[2] << 8 | data[3])
+        elif command == 0x2C:
+            self._write_memory(data)
+
+    def send_data_dma(self, data):
+        self.send_data(data)
+        # The "transfer" is complete as soon as it is copied.
+        lv.disp_flush_ready(self.disp_drv)
+
+    def _write_memory(self, data):
+        x1, x2 = self._columns
+        y2 = self._rows[1]
+        data = memoryview(data)
+        framebuffer = self._framebuffer
+        start = 0
+        size = len(data)
+        while start < size and self._y <= y2:
+            # Fill the rest of the current window row.
+            offset = (self._y * self.width + self._x) * 2
+            count = min(size - start, (x2 - self._x + 1) * 2)
+            framebuffer[offset:offset + count] = data[start:start + count]
+            start += count
+            self._x += count // 2
+            if self._x > x2:
+                self._x = x1
+                self._y += 1
+
+    def flush(self, disp_drv, area, color_p):
+        # Check before the transfer completes; `lv.disp_flush_ready()` clears
+        # the flag.
+        last = _disp_flush_is_last(disp_drv)
+        data = self._area_data
+        data[0] = area.x1 >> 8
+        data[1] = area.x1 & 0xFF
+        data[2] = area.x2 >> 8
+        data[3] = area.x2 & 0xFF
+        self.send_cmd(0x2A)
+        self.send_data(data)
+        data[0] = area.y1 >> 8
+        data[1] = area.y1 & 0xFF
+        data[2] = area.y2 >> 8
+        data[3] = area.y2 & 0xFF
+        self.send_cmd(0x2B)
+        self.send_data(data)
+        size = ((area.x2 - area.x1 + 1) * (area.y2 - area.y1 + 1) *
+                lv.color_t.SIZE)
+        self.send_cmd(0x2C)
+        self.send_data_dma(color_p.__dereference__(size))
+        if last:
+            self.frames += 1
+
+    def pixel(self, x, y):
+        '''
+        Returns
+        -------
+        tuple
+            8-bit ``(r, g, b)`` colour of the framebuffer pixel at ``(x, y)``.
+        '''
+        offset = (y * self.width + x) * 2
+        high = self.framebuffer[offset]
+        low = self.framebuffer[offset + 1]
+        if not self._swapped:
+            high, low = low, high
+        return (high & 0xF8, ((high << 5) | (low >> 3)) & 0xFC,
+                (low << 3) & 0xF8)
+
+    def snapshot_ppm(self, path):
+        '''
+        Write the framebuffer to ``path`` as a binary (P6) PPM image.
+        '''
+        row = bytearray(3 * self.width)
+        with open(path, 'wb') as output:
+            header = 'P6\n%d %d\n255\n' % (self.width, self.height)
+            output.write(header.encode())
+            for y in range(self.height):
+                for x in range(self.width):
+                    r, g, b = self.pixel(x, y)
+                    row[3 * x] = r
+                    row[3 * x + 1] = g
+                    row[3 * x + 2] = b
+                output.write(row)
@@ -0,0 +1,264 @@
+import array
+
+import uasyncio as asyncio
+import utime
+
+
+__all__ = ['I2CBus', 'PRIORITY_INPUT', 'PRIORITY_NORMAL',
+           'PRIORITY_BACKGROUND']
+
+
+# Queued transaction priorities; lower values are served first.
+PRIORITY_INPUT = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BACKGROUND = 2
+
+# Request slot states.
+_FREE = 0
+_QUEUED = 1
+_DONE = 2
+_FAILED = 3
+
+# Per-device statistics.
+_TRANSACTIONS = 0
+_ERRORS = 1
+_TOTAL_US = 2
+_MAX_US = 3
+
+# `errno.EBUSY`.
+_EBUSY = 16
+
+
+class I2CBus:
+    '''
+    Serialize transactions on a ``machine.I2C`` bus shared by several
+    clients.
+
+    The synchronous ``readfrom_into``, ``writeto``, ``readfrom_mem_into`` and
+    ``writeto_mem`` methods make a bus a drop-in replacement for
+    ``machine.I2C`` (e.g., for :class:`FacesEncoderInputEncoder`); they run
+    immediately, so input reads never wait behind queued work, and raise
+    ``OSError(EBUSY)`` if the bus is in use (e.g., from a callback that
+    interrupted another transaction).
+
+    Coroutines queue transactions with :meth:`read` and :meth:`write`.
+    Queued transactions are run back-to-back in batches of at most
+    ``batch``, in priority order.  Each is run on its own, so reads of FIFO
+    or clear-on-read registers never share data.
+
+    Latency and error counts are kept per device address; see :meth:`stats`.
+
+    Parameters
+    ----------
+    i2c : machine.I2C
+        Underlying bus.
+    queue_size : int
+        Number of queued transactions; further requests wait for a free
+        slot.
+    batch : int
+        Maximum number of queued transactions run before the bus is
+        released to other tasks.
+    poll_ms : int
+        Interval at which waiting coroutines check their request.
+    '''
+    def __init__(self, i2c, queue_size=8, batch=4, poll_ms=2):
+        self.i2c = i2c
+        self.queue_size = queue_size
+        self.batch = batch
+        self.poll_ms = poll_ms
+        # Preallocated request slots.
+        self._state = bytearray(queue_size)
+        self._priority = bytearray(queue_size)
+        self._write = bytearray(queue_size)
+        self._addr = bytearray(queue_size)
+        self._memaddr = array.array('i', [-1] * queue_size)
+        self._buf = [None] * queue_size
+        self._error = [None] * queue_size
+        # Queue order among equal priorities.
+        self._sequence = array.array('I', bytearray(4 * queue_size))
+        self._next_sequence = 0
+        self._busy = False
+        self._stats = {}
+        self.collisions = 0
+
+    # Drop-in `machine.I2C` interface.
+    def readfrom_into(self, addr, buf):
+        self._transfer(addr, buf, False, -1)
+
+    def writeto(self, addr, buf):
+        self._transfer(addr, buf, True, -1)
+        return len(buf)
+
+    def readfrom_mem_into(self, addr, memaddr, buf):
+        self._transfer(addr, buf, False, memaddr)
+
+    def writeto_mem(self, addr, memaddr, buf):
+        self._transfer(addr, buf, True, memaddr)
+
+    def scan(self):
+        return self.i2c.scan()
+
+    def _transfer(self, addr, buf, write, memaddr):
+        if self._busy:
+            self.collisions += 1
+            raise OSError(_EBUSY)
+        self._busy = True
+        try:
+            self._run(addr, buf, write, memaddr)
+        finally:
+            self._busy = False
+
+    def _run(self, addr, buf, write, memaddr):
+        stats = self._stats.get(addr)
+        if stats is None:
+            stats = array.array('I', bytearray(16))
+            self._stats[addr] = stats
+        stats[_TRANSACTIONS] += 1
+        start = utime.ticks_us()
+        try:
+            if write:
+                if memaddr < 0:
+                    self.i2c.writeto(addr, buf)
+                else:
+                    self.i2c.writeto_mem(addr, memaddr, buf)
+            elif memaddr < 0:
+                self.i2c.readfrom_into(addr, buf)
+            else:
+                self.i2c.readfrom_mem_into(addr, memaddr, buf)
+        except OSError:
+            stats[_ERRORS] += 1
+            raise
+        finally:
+            elapsed = utime.ticks_diff(utime.ticks_us(), start)
+            stats[_TOTAL_US] += elapsed
+            if elapsed > stats[_MAX_US]:
+                stats[_MAX_US] = elapsed
+
+    # Queued interface.
+    async def read(self, addr, buf, priority=PRIORITY_NORMAL, memaddr=-1):
+        '''
+        Queue a read of ``len(buf)`` bytes into ``buf`` and wait for it.
+        '''
+        await self._request(addr, buf, False, memaddr, priority)
+
+    async def write(self, addr, buf, priority=PRIORITY_NORMAL, memaddr=-1):
+        '''
+        Queue a write of ``buf`` and wait for it.
+        '''
+        await self._request(addr, buf, True, memaddr, priority)
+
+    async def _request(self, addr, buf, write, memaddr, priority):
+        while True:
+            slot = self._find_free()
+            if slot >= 0:
+                break
+            await asyncio.sleep_ms(self.poll_ms)
+        self._state[slot] = _QUEUED
+        self._priority[slot] = priority
+        self._write[slot] = write
+        self._addr[slot] = addr
+        self._memaddr[slot] = memaddr
+        self._buf[slot] = buf
+        self._sequence[slot] = self._next_sequence
+        self._next_sequence = (self._next_sequence + 1) & 0x3FFFFFFF
+        # Let other ready tasks queue their requests first, so the batch is
+        # ordered by priority rather than by arrival.
+        await asyncio.sleep_ms(0)
+        while self._state[slot] == _QUEUED:
+            if not self._busy:
+                self.run_queue()
+            if self._state[slot] == _QUEUED:
+                await asyncio.sleep_ms(self.poll_ms)
+        error = self._error[slot]
+        self._buf[slot] = None
+        self._error[slot] = None
+        self._state[slot] = _FREE
+        if error is not None:
+            raise error
+
+    def _find_free(self):
+        for slot in range(self.queue_size):
+            if self._state[slot] == _FREE:
+                return slot
+        return -1
+
+    def _next_slot(self):
+        best = -1
+        for slot in range(self.queue_size):
+            if self._state[slot] != _QUEUED:
+                continue
+            if (best < 0 or self._priority[slot] < self._priority[best] or
+                    (self._priority[slot] == self._priority[best] and
+                     self._sequence[slot] < self._sequence[best])):
+                best = slot
+        return best
+
+    def run_queue(self):
+        '''
+        Run up to ``batch`` queued transactions, highest priority first.
+
+        Returns
+        -------
+        int
+            Number of transactions run.
+        '''
+        if self._busy:
+            return 0
+        self._busy = True
+        count = 0
+        try:
+            while count < self.batch:
+                slot = self._next_slot()
+                if slot < 0:
+                    break
+                self._run_slot(slot)
+                count += 1
+        finally:
+            self._busy = False
+        return count
+
+    def _run_slot(self, slot):
+        addr = self._addr[slot]
+        buf = self._buf[slot]
+        write = self._write[slot]
+        memaddr = self._memaddr[slot]
+        try:
+            self._run(addr, buf, write, memaddr)
+        except OSError as exception:
+            self._error[slot] = exception
+            self._state[slot] = _FAILED
+        else:
+            self._state[slot] = _DONE
+
+    def stats(self, addr=None):
+        '''
+        Returns
+        -------
+        dict
+            ``transactions``, ``errors``, ``mean_us`` and ``max_us`` for
+            device ``addr``, or a dictionary of those by address if ``addr``
+            is ``None``.
+        '''
+        if addr is None:
+            return {addr: self.stats(addr) for addr in self._stats}
+        stats = self._stats.get(addr)
+        if stats is None:
+            return None
+        transactions = stats[_TRANSACTIONS]
+        return {'transactions': transactions,
+                'errors': stats[_ERRORS],
+                'mean_us': (stats[_TOTAL_US] // transactions
+                            if transactions else 0),
+                'max_us': stats[_MAX_US]}
+
+    def reset_stats(self):
+        self._stats = {}
+        self.collisions = 0
+
+    def dump(self):
+        for addr in sorted(self._stats):
+            stats = self.stats(addr)
+            print('0x%02x %8d transactions %5d errors mean=%5dus max=%6dus' %
+                  (addr, stats['transactions'], stats['errors'],
+                   stats['mean_us'], stats['max_us']))
+        print('%d collisions' % self.collisions)
@@ -0,0 +1,82 @@
+import lvgl as lv
+
+from . import gc_scheduler as _gc_scheduler
+from . import timeline as _timeline
+from .event_ring import EVENT_LEFT, EVENT_RIGHT, EVENT_PRESS, EVENT_RELEASE
+
+
+__all__ = ['EncoderInputDriver']
+
+
+class EncoderInputDriver:
+    def __init__(self, encoder, group=None, gc_scheduler=None,
+                 buffered=False, tracer=None):
+        if gc_scheduler is None:
+            gc_scheduler = _gc_scheduler.scheduler
+        if tracer is None:
+            tracer = getattr(encoder, 'tracer', None)
+        if buffered:
+            # Replay recorded events one per read, in order, and ask LVGL to
+            # read again straight away while more are queued.
+            events = getattr(encoder, 'events', None)
+            if events is None:
+                raise ValueError('Buffered mode requires an encoder that '
+                                 'records `events`.')
+        else:
+            events = None
+        self._pressed = False
+
+        def input_callback(drv, data):
+            if events is None:
+                diff = encoder.diff
+                pressed = encoder.pressed
+                more = False
+            else:
+                code = events.pop()
+                diff = 0
+                if code == EVENT_LEFT:
+                    diff = -1
+                elif code == EVENT_RIGHT:
+                    diff = 1
+                elif code == EVENT_PRESS:
+                    self._pressed = True
+                elif code == EVENT_RELEASE:
+                    self._pressed = False
+                else:
+                    # Queue drained; track the settled button state.
+                    self._pressed = encoder.pressed
+                pressed = self._pressed
+                more = len(events) > 0
+            data.enc_diff = diff
+            if pressed:
+                data.state = lv.INDEV_STATE.PR
+            else:
+                data.state = lv.INDEV_STATE.REL
+            # Collect only when the heap or idle time calls for it; a full
+            # `gc.collect()` on every indev poll stalls `lv.task_handler`.
+            gc_scheduler.poll(diff != 0 or pressed)
+            if tracer is not None:
+                tracer.consume()
+            return more
+
+        self.drv = lv.indev_drv_t()
+        self.encoder = encoder
+        self.gc_scheduler = gc_scheduler
+        self.buffered = buffered
+        self.tracer = tracer
+        lv.indev_drv_init(self.drv)
+        self.drv.type = lv.INDEV_TYPE.ENCODER
+        self.drv.read_cb = input_callback
+        self.win_drv = lv.indev_drv_register(self.drv)
+        _timeline.mark('indev register')
+        self.group = group
+
+    @property
+    def group(self):
+        return self._group
+
+    @group.setter
+    def group(self, value):
+        self._group = value
+        if self._group is not None:
+            lv.indev_set_group(self.win_drv, self._group)
@@ -0,0 +1,173 @@
+import array
+
+import uasyncio as asyncio
+import utime
+
+from .faces import ENCODER_LED_COUNT
+
+
+__all__ = ['LedAnimation', 'LedAnimator', 'spinner', 'pulse']
+
+
+class LedAnimation:
+    '''
+    Precomputed LED ring keyframes.
+
+    Parameters
+    ----------
+    frames : array.array or bytearray
+        ``length * 3 * led_count`` bytes: RGB per LED, per frame.
+    led_count : int
+        Number of LEDs per frame.
+    '''
+    def __init__(self, frames, led_count=ENCODER_LED_COUNT):
+        self.frames = frames
+        self.stride = 3 * led_count
+        self.length = len(frames) // self.stride
+
+
+def _scale(value, numerator, denominator):
+    return value * numerator // denominator
+
+
+def spinner(colour, tail=4, led_count=ENCODER_LED_COUNT):
+    '''
+    One lit LED circling the ring, followed by a fading ``tail``.
+    '''
+    r, g, b = colour
+    frames = array.array('B', bytearray(3 * led_count * led_count))
+    for frame in range(led_count):
+        for k in range(tail):
+            offset = 3 * (frame * led_count + (frame - k) % led_count)
+            frames[offset] = _scale(r, tail - k, tail)
+            frames[offset + 1] = _scale(g, tail - k, tail)
+            frames[offset + 2] = _scale(b, tail - k, tail)
+    return LedAnimation(frames, led_count)
+
+
+def pulse(colour, steps=16, led_count=ENCODER_LED_COUNT):
+    '''
+    The whole ring fading up to ``colour`` and back down in ``steps`` frames.
+    '''
+    r, g, b = colour
+    half = steps // 2
+    frames = array.array('B', bytearray(3 * led_count * steps))
+    for frame in range(steps):
+        level = frame if frame <= half else steps - frame
+        for led in range(led_count):
+            offset = 3 * (frame * led_count + led)
+            frames[offset] = _scale(r, level, half)
+            frames[offset + 1] = _scale(g, level, half)
+            frames[offset + 2] = _scale(b, level, half)
+    return LedAnimation(frames, led_count)
+
+
+class LedAnimator:
+    '''
+    Play :class:`LedAnimation` keyframes on a Faces encoder LED ring from a
+    ``uasyncio`` task.
+
+    Only LEDs that changed are written, a few at a time, and writes are held
+    back while the encoder's poller is about to read, so animations never
+    delay input.  Frames that cannot be written within the frame budget are
+    skipped (counted in ``frames_dropped``).  Failed LED writes (e.g.,
+    while an :class:`I2CBus` is busy) are counted in ``bus_errors`` and
+    retried on the next frame.
+
+    Parameters
+    ----------
+    encoder : FacesEncoderInputEncoder
+        Encoder whose LED ring is animated.
+    fps : int
+        Animation frame rate.
+    writes_per_slice : int
+        LED writes between yields to other tasks.
+    guard_ms : int
+        Hold LED writes if an encoder poll is due within this many ms.
+    '''
+    def __init__(self, encoder, fps=20, writes_per_slice=2, guard_ms=2):
+        self.encoder = encoder
+        self.fps = fps
+        self.writes_per_slice = writes_per_slice
+        self.guard_ms = guard_ms
+        self.animation = None
+        self.repeat = True
+        self.frame = 0
+        self.frames_rendered = 0
+        self.frames_dropped = 0
+        self.bus_errors = 0
+        self._run_task_id = 0
+        self._running = False
+
+    @property
+    def playing(self):
+        return self.animation is not None
+
+    def play(self, animation, repeat=True):
+        self.animation = animation
+        self.repeat = repeat
+        self.frame = 0
+
+    def start(self, loop=None):
+        if self._running:
+            return
+        if loop is None:
+            loop = asyncio.get_event_loop()
+        self._running = True
+        self._run_task_id += 1
+        loop.create_task(self._run(self._run_task_id))
+
+    def stop(self):
+        self._running = False
+
+    async def _yield_to_input(self):
+        encoder = self.encoder
+        if not encoder.polling:
+            return
+        wait_ms = utime.ticks_diff(encoder.next_update, utime.ticks_ms())
+        if wait_ms < self.guard_ms:
+            # Let the poll run first (it is due now or overdue otherwise).
+            await asyncio.sleep_ms(max(wait_ms, 0))
+            await asyncio.sleep_ms(0)
+
+    async def _run(self, task_id):
+        encoder = self.encoder
+        due = utime.ticks_ms()
+        while self._running and task_id == self._run_task_id:
+            frame_ms = 1000 // self.fps
+            animation = self.animation
+            if animation is not None:
+                if self.frame >= animation.length:
+                    self.frame = 0
+                    if not self.repeat:
+                        self.animation = None
+                        continue
+                encoder.load_leds(animation.frames,
+                                  self.frame * animation.stride)
+                self.frame += 1
+                self.frames_rendered += 1
+                deadline = utime.ticks_add(due, frame_ms)
+                while encoder.leds_pending:
+                    await self._yield_to_input()
+                    try:
+                        encoder.flush(self.writes_per_slice)
+                    except OSError:
+                        # Unwritten LEDs stay pending for the next frame.
+                        self.bus_errors += 1
+                        break
+                    await asyncio.sleep_ms(0)
+                    if utime.ticks_diff(deadline, utime.ticks_ms()) <= 0:
+                        # Over budget; remaining writes carry over to the next
+                        # frame.
+                        break
+            due = utime.ticks_add(due, frame_ms)
+            wait_ms = utime.ticks_diff(due, utime.ticks_ms())
+            if wait_ms < 0:
+                # Skip the frames we have no time for.
+                skipped = -wait_ms // frame_ms
+                if animation is not None:
+                    self.frame += skipped
+                    self.frames_dropped += skipped
+                due = utime.ticks_ms()
+                wait_ms = 0
+            await asyncio.sleep_ms(wait_ms)
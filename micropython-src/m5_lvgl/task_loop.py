@@ -0,0 +1,118 @@
+import lvgl as lv
+import uasyncio as asyncio
+import utime
+
+
+__all__ = ['TaskLoop']
+
+
+# `uasyncio` v3 (MicroPython 1.15+) can wake a sleeping task from an IRQ
+# handler; with older versions, sleeps are sliced to check for wake-ups.
+_ThreadSafeFlag = getattr(asyncio, 'ThreadSafeFlag', None)
+
+
+class TaskLoop:
+    '''
+    Run LVGL (``lv.tick_inc`` and ``lv.task_handler``) from a ``uasyncio``
+    task instead of the ``lvesp32`` hardware timer.
+
+    Between calls the task sleeps until the next LVGL task is due, or until
+    :meth:`wake` is called, e.g., by an input encoder attached with
+    :meth:`attach`.  Input polling and rendering then share one cooperative
+    scheduler.
+
+    Only LVGL 7+ reports when its next task is due.  On LVGL 6 (which this
+    package targets) ``lv.task_handler`` returns nothing, so the loop runs
+    at a fixed ``period_ms``, and only wake-ups shorten a sleep.  Where
+    ``uasyncio`` provides ``ThreadSafeFlag``, a wake-up ends the sleep
+    directly; otherwise sleeps are sliced into ``wake_check_ms`` steps.
+
+    Construct the display with ``M5ili9341(use_lvesp32=False)`` so that the
+    ``lvesp32`` timer is not started as well.
+
+    Parameters
+    ----------
+    period_ms : int
+        Sleep between calls if LVGL does not report when it is next due.
+    max_sleep_ms : int
+        Upper bound on any sleep.
+    wake_check_ms : int
+        Without ``ThreadSafeFlag``, sleep granularity: a wake-up is noticed
+        within this many ms.
+    '''
+    def __init__(self, period_ms=30, max_sleep_ms=100, wake_check_ms=10):
+        self.period_ms = period_ms
+        self.max_sleep_ms = max_sleep_ms
+        self.wake_check_ms = wake_check_ms
+        self._woken = False
+        self._flag = None if _ThreadSafeFlag is None else _ThreadSafeFlag()
+        self._run_task_id = 0
+        self._running = False
+        # Statistics.
+        self.calls = 0
+        self.wakes = 0
+        self.busy_us = 0
+
+    def wake(self):
+        '''
+        Run ``lv.task_handler`` as soon as possible.  Safe to call from an
+        IRQ handler.
+        '''
+        self._woken = True
+        if self._flag is not None:
+            self._flag.set()
+
+    def attach(self, encoder):
+        '''
+        Wake the loop whenever ``encoder`` reports new input.
+        '''
+        encoder.on_input = self.wake
+
+    def start(self, loop=None):
+        if self._running:
+            return
+        if loop is None:
+            loop = asyncio.get_event_loop()
+        self._running = True
+        self._run_task_id += 1
+        loop.create_task(self._run(self._run_task_id))
+
+    def stop(self):
+        self._running = False
+
+    async def _run(self, task_id):
+        last = utime.ticks_ms()
+        while self._running and task_id == self._run_task_id:
+            now = utime.ticks_ms()
+            lv.tick_inc(utime.ticks_diff(now, last))
+            last = now
+            self._woken = False
+            start = utime.ticks_us()
+            due_ms = lv.task_handler()
+            self.busy_us += utime.ticks_diff(utime.ticks_us(), start)
+            self.calls += 1
+            if not isinstance(due_ms, int):
+                due_ms = self.period_ms
+            sleep_ms = min(max(due_ms, 0), self.max_sleep_ms)
+            slept = False
+            if self._flag is not None:
+                if sleep_ms > 0:
+                    # Returns at once if woken while LVGL ran.
+                    try:
+                        await asyncio.wait_for_ms(self._flag.wait(),
+                                                  sleep_ms)
+                    except asyncio.TimeoutError:
+                        pass
+                    slept = True
+            else:
+                # Sleep in slices so that `wake()` cuts the sleep short.
+                while sleep_ms > 0 and not self._woken:
+                    step_ms = min(sleep_ms, self.wake_check_ms)
+                    await asyncio.sleep_ms(step_ms)
+                    sleep_ms -= step_ms
+                    slept = True
+            if self._woken:
+                self.wakes += 1
+            if not slept:
+                # Always let other tasks run, even under constant input.
+                await asyncio.sleep_ms(0)
@@ -0,0 +1,104 @@
+import array
+
+import utime
+
+
+__all__ = ['Timeline', 'enable', 'disable', 'mark', 'dump']
+
+
+class Timeline:
+    '''
+    Named ``utime.ticks_us()`` timestamps in preallocated storage.
+
+    Parameters
+    ----------
+    capacity : int
+        Maximum number of marks; further marks are dropped and counted in
+        ``overflows``.
+    '''
+    def __init__(self, capacity=32):
+        self.capacity = capacity
+        self._us = array.array('I', bytearray(4 * capacity))
+        self._names = [None] * capacity
+        self.count = 0
+        self.overflows = 0
+
+    def mark(self, name):
+        count = self.count
+        if count >= self.capacity:
+            self.overflows += 1
+            return
+        self._us[count] = utime.ticks_us()
+        self._names[count] = name
+        self.count = count + 1
+
+    def reset(self):
+        for i in range(self.count):
+            self._names[i] = None
+        self.count = 0
+        self.overflows = 0
+
+    def phases(self):
+        '''
+        Returns
+        -------
+        list
+            ``(name, phase_us, elapsed_us)`` per mark: the time since the
+            previous mark and since the first mark.
+        '''
+        result = []
+        for i in range(self.count):
+            previous = self._us[i - 1] if i else self._us[0]
+            result.append((self._names[i],
+                           utime.ticks_diff(self._us[i], previous),
+                           utime.ticks_diff(self._us[i], self._us[0])))
+        return result
+
+    def dump(self):
+        phases = self.phases()
+        if not phases:
+            print('No timeline marks.')
+            return
+        total = phases[-1][2]
+        print('%-20s %10s %10s' % ('phase', 'took', 'elapsed'))
+        for name, phase_us, elapsed_us in phases:
+            bar = '#' * (40 * phase_us // total if total else 0)
+            print('%-20s %8dus %8dus %s' % (name, phase_us, elapsed_us, bar))
+        if self.overflows:
+            print('%d marks dropped' % self.overflows)
+
+
+# Timeline recording marks, or `None` while disabled.
+active = None
+
+
+def enable(capacity=32):
+    '''
+    Start recording marks, beginning with an ``'enable'`` mark.
+
+    Returns
+    -------
+    Timeline
+        The active timeline.
+    '''
+    global active
+    active = Timeline(capacity)
+    active.mark('enable')
+    return active
+
+
+def disable():
+    global active
+    active = None
+
+
+def mark(name):
+    if active is not None:
+        active.mark(name)
+
+
+def dump():
+    if active is None:
+        print('Timeline not enabled.')
+    else:
+        active.dump()
@@ -0,0 +1,136 @@
+import array
+
+import utime
+
+
+__all__ = ['LatencyTracer']
+
+
+class LatencyTracer:
+    '''
+    Input-to-photon latency tracing.
+
+    Input sources call :meth:`capture` when an input edge or reading arrives,
+    the LVGL read callback calls :meth:`consume` when it hands input to LVGL,
+    and the display calls :meth:`flushed` once the last area of a frame has
+    been sent to the panel.  Each captured input then yields two samples:
+    capture to read callback, and capture to flush.
+
+    All storage is preallocated and the hooks do not allocate, so
+    :meth:`capture` may be called from an IRQ handler.
+
+    Parameters
+    ----------
+    pending : int
+        Maximum number of captured inputs awaiting a flush; further captures
+        are dropped and counted in ``overflows``.
+    samples : int
+        Number of most recent latency samples kept for statistics.
+    '''
+    def __init__(self, pending=16, samples=256):
+        self.pending = pending
+        self._capture_us = array.array('I', bytearray(4 * pending))
+        self._read_us = array.array('I', bytearray(4 * pending))
+        # Sequence numbers: `_captured` is only written by `capture()`,
+        # `_consumed` by `consume()` and `_flushed` by `flushed()`.
+        self._captured = 0
+        self._consumed = 0
+        self._flushed = 0
+        self.overflows = 0
+        self.size = samples
+        self._read_latency = array.array('I', bytearray(4 * samples))
+        self._flush_latency = array.array('I', bytearray(4 * samples))
+        self.count = 0
+
+    def capture(self):
+        captured = self._captured
+        if captured - self._flushed >= self.pending:
+            self.overflows += 1
+            return
+        self._capture_us[captured % self.pending] = utime.ticks_us()
+        self._captured = captured + 1
+
+    def consume(self):
+        captured = self._captured
+        consumed = self._consumed
+        if consumed == captured:
+            return
+        now = utime.ticks_us()
+        while consumed < captured:
+            self._read_us[consumed % self.pending] = now
+            consumed += 1
+        self._consumed = consumed
+
+    def flushed(self):
+        consumed = self._consumed
+        flushed = self._flushed
+        if flushed == consumed:
+            return
+        now = utime.ticks_us()
+        while flushed < consumed:
+            slot = flushed % self.pending
+            capture_us = self._capture_us[slot]
+            sample = self.count % self.size
+            self._read_latency[sample] = utime.ticks_diff(self._read_us[slot],
+                                                          capture_us)
+            self._flush_latency[sample] = utime.ticks_diff(now, capture_us)
+            self.count += 1
+            flushed += 1
+        self._flushed = flushed
+
+    def reset(self):
+        self._consumed = self._captured
+        self._flushed = self._captured
+        self.overflows = 0
+        self.count = 0
+
+    def percentiles(self, percents=(50, 95, 99)):
+        '''
+        Returns
+        -------
+        dict
+            ``'read'`` and ``'flush'`` latency percentiles in microseconds,
+            each a dictionary keyed by percent, or ``None`` with no samples.
+        '''
+        n = min(self.count, self.size)
+        if not n:
+            return None
+        result = {}
+        for name, samples in (('read', self._read_latency),
+                              ('flush', self._flush_latency)):
+            ordered = sorted(samples[:n])
+            result[name] = {p: ordered[min(n - 1, n * p // 100)]
+                            for p in percents}
+        return result
+
+    def histogram(self, bin_us=10000, bins=10):
+        '''
+        Returns
+        -------
+        list
+            Capture-to-flush sample counts per ``bin_us`` wide bin; the last
+            bin also counts all slower samples.
+        '''
+        counts = [0] * bins
+        for latency in self._flush_latency[:min(self.count, self.size)]:
+            counts[min(bins - 1, latency // bin_us)] += 1
+        return counts
+
+    def dump(self, bin_us=10000, bins=10):
+        stats = self.percentiles()
+        if stats is None:
+            print('No latency samples.')
+            return
+        print('%d samples (%d dropped)' % (min(self.count, self.size),
+                                           self.overflows))
+        for name in ('read', 'flush'):
+            print('%-6s p50=%6dus p95=%6dus p99=%6dus' %
+                  (name, stats[name][50], stats[name][95], stats[name][99]))
+        counts = self.histogram(bin_us, bins)
+        width = max(counts)
+        for i, count in enumerate(counts):
+            label = '%3d-%dms' % (i * bin_us // 1000, (i + 1) * bin_us // 1000)
+            if i == bins - 1:
+                label = '>=%dms' % (i * bin_us // 1000)
+            bar = '#' * (40 * count // width if width else 0)
+            print('%10s %5d %s' % (label, count, bar))
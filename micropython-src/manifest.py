@@ -0,0 +1,13 @@
+# Freeze `m5_lvgl` into the firmware, e.g., from a board manifest:
+#
+#     include('/path/to/m5-lvgl/micropython-src/manifest.py')
+#
+# or, for the unix port (see `benchmarks/bench_mpy.py`):
+#
+#     cd ports/unix
+#     make FROZEN_MANIFEST=/path/to/m5-lvgl/micropython-src/manifest.py
+#
+# Frozen modules are precompiled and run from flash, so importing them
+# neither compiles nor copies bytecode into the heap.  Paths in a manifest
+# are relative to the manifest.
+freeze('.', 'm5_lvgl')